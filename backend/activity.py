@@ -0,0 +1,196 @@
+from datetime import date, timedelta
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+import models
+
+
+COUNTERS = ("completed_tasks", "completed_plans")
+BUCKETS = ("day", "week", "month")
+
+
+def _daily_counts():
+    item = models.StudyItem
+
+    return select(
+        item.owner_id,
+        item.completed_date,
+        func.sum(case((item.type == "task", 1), else_=0)).label("completed_tasks"),
+        func.sum(case((item.type == "plan", 1), else_=0)).label("completed_plans"),
+    ).where(
+        item.completed == True,
+        item.completed_date.is_not(None),
+    ).group_by(item.owner_id, item.completed_date)
+
+
+# -----------------------------
+# INCREMENTAL UPDATES
+# -----------------------------
+def count_days(rows) -> dict:
+    """(type, completed_date) -> completions, for rows of item columns."""
+    counts = {}
+    for item_type, completed, day in rows:
+        if completed and day:
+            counts[item_type, day] = counts.get((item_type, day), 0) + 1
+    return counts
+
+
+def rebuild_user_day(db: Session, user_id: int, day: date):
+    # Counts whatever is already flushed, like stats.rebuild_user_stats.
+    item = models.StudyItem
+    row = db.execute(
+        _daily_counts().where(item.owner_id == user_id, item.completed_date == day)
+    ).first()
+
+    activity = db.get(models.DailyActivity, (user_id, day))
+    if activity is None:
+        activity = models.DailyActivity(user_id=user_id, day=day)
+        db.add(activity)
+
+    for name in COUNTERS:
+        setattr(activity, name, getattr(row, name) if row else 0)
+
+    db.flush()
+    return activity
+
+
+def apply_completions(db: Session, user_id: int, item_type: str, day: date, count: int = 1):
+    """Add (or with a negative count, remove) completions on one day."""
+    db.flush()
+
+    activity = models.DailyActivity
+    column = activity.completed_tasks if item_type == "task" else activity.completed_plans
+
+    result = db.execute(
+        update(activity)
+        .where(activity.user_id == user_id, activity.day == day)
+        .values({column: column + count})
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount == 0:
+        rebuild_user_day(db, user_id, day)
+
+
+def _upsert(dialect: str):
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        return None
+    return upsert
+
+
+def apply_day_counts(db: Session, user_id: int, counts: dict, sign: int = 1):
+    """apply_completions for every (type, day) in a count_days() result.
+
+    Additions spanning many days (imports) go out as one executemany
+    upsert where the backend has ON CONFLICT; removals keep the
+    update-or-recount path.
+    """
+    upsert = _upsert(db.get_bind().dialect.name) if sign > 0 else None
+    if upsert is None:
+        for (item_type, day), count in counts.items():
+            apply_completions(db, user_id, item_type, day, sign * count)
+        return
+    if not counts:
+        return
+
+    days = {}
+    for (item_type, day), count in counts.items():
+        row = days.setdefault(day, {
+            "user_id": user_id, "day": day, "completed_tasks": 0, "completed_plans": 0,
+        })
+        row["completed_tasks" if item_type == "task" else "completed_plans"] += count
+
+    db.flush()
+    activity = models.DailyActivity
+    statement = upsert(activity)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[activity.user_id, activity.day],
+            set_={
+                name: getattr(activity, name) + getattr(statement.excluded, name)
+                for name in COUNTERS
+            },
+        ),
+        list(days.values()),
+    )
+
+
+def backfill(db) -> int:
+    """Recompute the whole rollup from study_items in two statements.
+
+    Takes a Session or a Connection and leaves the commit to the caller.
+    """
+    db.execute(delete(models.DailyActivity))
+    result = db.execute(
+        insert(models.DailyActivity).from_select(
+            ("user_id", "day", *COUNTERS), _daily_counts()
+        )
+    )
+    return result.rowcount
+
+
+def rebuild_all(db: Session) -> int:
+    rows = backfill(db)
+    db.commit()
+    return rows
+
+
+# -----------------------------
+# READS
+# -----------------------------
+def bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def history(db: Session, user_id: int, start: date, end: date, bucket: str = "day") -> list[dict]:
+    """Non-empty buckets between start and end (inclusive), oldest first."""
+    activity = models.DailyActivity
+    rows = db.execute(
+        select(activity.day, activity.completed_tasks, activity.completed_plans)
+        .where(activity.user_id == user_id, activity.day.between(start, end))
+        .order_by(activity.day)
+    )
+
+    buckets = {}
+    for day, tasks, plans in rows:
+        if not tasks and not plans:
+            continue
+        key = bucket_start(day, bucket)
+        counts = buckets.setdefault(key, [0, 0])
+        counts[0] += tasks
+        counts[1] += plans
+
+    return [
+        {"date": key, "completed_tasks": tasks, "completed_plans": plans, "total": tasks + plans}
+        for key, (tasks, plans) in buckets.items()
+    ]
+
+
+def longest_streak(db: Session, user_id: int) -> int:
+    """Longest run of consecutive days with a completed task.
+
+    Tasks only, as for the current streak.
+    """
+    activity = models.DailyActivity
+    days = db.scalars(
+        select(activity.day)
+        .where(activity.user_id == user_id, activity.completed_tasks > 0)
+        .order_by(activity.day)
+    )
+
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous == day - timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    return longest
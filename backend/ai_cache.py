@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import aclosing
+
+from starlette.concurrency import run_in_threadpool
+
+from cache import TTLCache
+from metrics import Counter
+
+
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "86400"))
+AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "2048"))
+# Optional second tier that survives restarts and is shared by workers.
+AI_CACHE_DB = os.getenv("AI_CACHE_DB")
+AI_CACHE_DB_MAX_ENTRIES = int(os.getenv("AI_CACHE_DB_MAX_ENTRIES", "50000"))
+
+cache_requests = Counter(
+    "ai_cache_requests_total",
+    "AI answer cache lookups by outcome",
+    labelnames=("result",),  # hit, persistent_hit, coalesced, miss
+)
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.casefold().split())
+
+
+def cache_key(question: str, model_name: str) -> str:
+    normalized = normalize_question(question)
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode()).hexdigest()
+
+
+class SQLiteCacheStore:
+    """Persistent LRU-by-last-use store in a standalone SQLite file."""
+
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_cache ("
+            " key TEXT PRIMARY KEY, answer TEXT NOT NULL,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_ai_cache_last_used ON ai_cache (last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer FROM ai_cache WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE ai_cache SET last_used = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+        return row[0] if row else None
+
+    def set(self, key: str, answer: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_cache VALUES (?, ?, ?, ?)",
+                (key, answer, now, now),
+            )
+            self._writes += 1
+            # Trim in batches rather than counting rows on every write.
+            if self._writes % 100 == 0:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute(
+            "DELETE FROM ai_cache WHERE created_at <= ?", (now - self.ttl,)
+        )
+        self._conn.execute(
+            "DELETE FROM ai_cache WHERE key IN ("
+            " SELECT key FROM ai_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_cache")
+            self._conn.commit()
+
+
+class AIResponseCache:
+    def __init__(self, memory: TTLCache, store: SQLiteCacheStore = None):
+        self.memory = memory
+        self.store = store
+        self._inflight = {}  # key -> asyncio.Future
+
+    async def get_or_compute(self, key: str, compute):
+        answer = self.memory.get(key)
+        if answer is not None:
+            cache_requests.inc("hit")
+            return answer
+
+        # Identical questions already on their way upstream share one call.
+        pending = self._inflight.get(key)
+        if pending is not None:
+            cache_requests.inc("coalesced")
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The leader's client went away, not ours: ask again, and
+                # the first follower to get here becomes the new leader.
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.get_or_compute(key, compute)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            answer = await self._lookup_store(key)
+            if answer is not None:
+                cache_requests.inc("persistent_hit")
+            else:
+                cache_requests.inc("miss")
+                answer = await compute()
+                if self.store is not None:
+                    await run_in_threadpool(self.store.set, key, answer)
+
+            self.memory.set(key, answer)
+            future.set_result(answer)
+            return answer
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Waiters re-raise it; don't warn about an unretrieved exception.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def stream(self, key: str, produce):
+        """Like get_or_compute for an answer that arrives in pieces.
+
+        ``produce()`` is an async iterator of text, only started on a miss.
+        Yields (text, cached): the pieces as they arrive, or a cached or
+        coalesced answer in one piece. Leaving the loop early (e.g. the
+        client went away) lets coalesced requests ask again.
+        """
+        answer = self.memory.get(key)
+        if answer is not None:
+            cache_requests.inc("hit")
+            yield answer, True
+            return
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            cache_requests.inc("coalesced")
+            try:
+                answer = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    async with aclosing(self.stream(key, produce)) as pieces:
+                        async for piece in pieces:
+                            yield piece
+                    return
+                raise
+            yield answer, True
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            answer = await self._lookup_store(key)
+            if answer is not None:
+                cache_requests.inc("persistent_hit")
+                yield answer, True
+            else:
+                cache_requests.inc("miss")
+                parts = []
+                async with aclosing(produce()) as pieces:
+                    async for text in pieces:
+                        parts.append(text)
+                        yield text, False
+                answer = "".join(parts)
+                if self.store is not None:
+                    await run_in_threadpool(self.store.set, key, answer)
+
+            self.memory.set(key, answer)
+            future.set_result(answer)
+        except (asyncio.CancelledError, GeneratorExit):
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _lookup_store(self, key: str):
+        if self.store is None:
+            return None
+        return await run_in_threadpool(self.store.get, key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": cache_requests.value("hit"),
+            "persistent_hits": cache_requests.value("persistent_hit"),
+            "coalesced": cache_requests.value("coalesced"),
+            "misses": cache_requests.value("miss"),
+            "entries": len(self.memory),
+            "in_flight": len(self._inflight),
+            "persistent": self.store is not None,
+        }
+
+
+answers = AIResponseCache(
+    TTLCache(maxsize=AI_CACHE_SIZE, ttl=AI_CACHE_TTL),
+    SQLiteCacheStore(AI_CACHE_DB, AI_CACHE_TTL, AI_CACHE_DB_MAX_ENTRIES)
+    if AI_CACHE_DB else None,
+)
@@ -1,9 +1,15 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import time
 from fastapi import Depends, HTTPException
 from jose import jwt, JWTError
 from fastapi.security import OAuth2PasswordBearer
 
+from metrics import Counter, Histogram
+
 
 SECRET_KEY = "SECRET"
 ALGORITHM = "HS256"
@@ -22,6 +28,69 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password[:72], hashed)
 
 
+# -----------------------------
+# HASHING EXECUTOR
+# -----------------------------
+# bcrypt releases the GIL while it works, so a small dedicated thread pool
+# gives real parallelism without touching the threadpool that the sync
+# routes run on. Calls beyond the pool plus HASH_MAX_PENDING are rejected
+# with 503 instead of queueing without bound during a login storm.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "4"))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "32"))
+
+hash_latency = Histogram(
+    "password_hash_seconds",
+    "Wall time of bcrypt hash/verify calls, including queueing",
+    labelnames=("op",),
+)
+hash_rejected = Counter(
+    "password_hash_rejected_total",
+    "bcrypt calls rejected because the hashing queue was full",
+    labelnames=("op",),
+)
+
+_hash_executor = None
+_hash_pending = 0
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=HASH_WORKERS, thread_name_prefix="bcrypt"
+        )
+    return _hash_executor
+
+
+async def _run_hashing(op: str, fn, *args):
+    global _hash_pending
+
+    if _hash_pending >= HASH_WORKERS + HASH_MAX_PENDING:
+        hash_rejected.inc(op)
+        raise HTTPException(
+            status_code=503,
+            detail="Authentication is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    _hash_pending += 1
+    start = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        _hash_pending -= 1
+        hash_latency.observe(time.perf_counter() - start, op)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing("hash", hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await _run_hashing("verify", verify_password, password, hashed)
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(hours=1)
@@ -29,9 +98,12 @@ def create_access_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def decode_access_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("sub")
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)):
+    return decode_access_token(token).get("sub")
@@ -0,0 +1,346 @@
+"""Mixed-workload load test against a freshly seeded database.
+
+    python -m benchmarks.load                          # in-process (ASGI)
+    python -m benchmarks.load --server --workers 4     # real uvicorn workers
+    python -m benchmarks.load --check                  # fail on regressions
+
+Run from backend/. Results are printed and written as JSON; ``--check``
+compares them with benchmarks/baseline.json (``--save-baseline`` replaces it).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).with_name("baseline.json")
+
+# Relative frequency of each request type in the mix.
+WEIGHTS = {
+    "login": 2,
+    "list": 25,
+    "list_projection": 10,
+    "create": 8,
+    "complete": 10,
+    "dashboard": 15,
+    "leaderboard": 15,
+    "leaderboard_me": 5,
+    "ai": 8,
+    "pdf": 2,
+}
+
+QUESTIONS = [f"Explain topic {n} in simple terms" for n in range(20)]
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    # Nearest-rank: an observed value, stable for small samples.
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: list[float], errors: int, seconds: float) -> dict:
+    samples = sorted(samples)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+    }
+
+
+# -----------------------------
+# WORKLOAD
+# -----------------------------
+class VirtualUser:
+    def __init__(self, client, email: str, item_ids: list[int], rng: random.Random, pdf: bytes):
+        self.client = client
+        self.email = email
+        self.item_ids = item_ids
+        self.rng = rng
+        self.pdf = pdf
+        self.headers = {}
+
+    async def login(self):
+        from benchmarks.seed import PASSWORD
+
+        response = await self.client.post(
+            "/auth/login", data={"username": self.email, "password": PASSWORD}
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    def request(self, scenario: str):
+        client, headers = self.client, self.headers
+        if scenario == "login":
+            return self.login()
+        if scenario == "list":
+            return client.get("/study-items/", params={"limit": 50}, headers=headers)
+        if scenario == "list_projection":
+            return client.get(
+                "/study-items/",
+                params={"limit": 200, "fields": "title,completed"},
+                headers=headers,
+            )
+        if scenario == "create":
+            return client.post(
+                "/study-items/",
+                json={"title": "Benchmark item", "type": self.rng.choice(["task", "plan"])},
+                headers=headers,
+            )
+        if scenario == "complete":
+            item_id = self.rng.choice(self.item_ids)
+            return client.patch(f"/study-items/{item_id}/complete", headers=headers)
+        if scenario == "dashboard":
+            return client.get("/dashboard/", headers=headers)
+        if scenario == "leaderboard":
+            return client.get("/leaderboard/", params={"limit": 20}, headers=headers)
+        if scenario == "leaderboard_me":
+            return client.get("/leaderboard/me", headers=headers)
+        if scenario == "ai":
+            return client.post(
+                "/ai/ask", json={"question": self.rng.choice(QUESTIONS)}, headers=headers
+            )
+        if scenario == "pdf":
+            return client.post(
+                "/pdf/summarize",
+                files={"file": ("notes.pdf", self.pdf, "application/pdf")},
+                headers=headers,
+            )
+        raise ValueError(scenario)
+
+
+async def drive(client, users, args) -> dict:
+    from tests.pdfs import make_pdf
+
+    pdf = make_pdf([f"Benchmark page {n}" for n in range(3)])
+    scenarios = [name for name in WEIGHTS if name in args.scenarios]
+    weights = [WEIGHTS[name] for name in scenarios]
+    samples = {name: [] for name in scenarios}
+    errors = {name: 0 for name in scenarios}
+
+    virtual_users = [
+        VirtualUser(client, email, item_ids, random.Random(args.seed + n), pdf)
+        for n, (email, item_ids) in enumerate(users[:args.concurrency])
+    ]
+    await asyncio.gather(*(user.login() for user in virtual_users))
+
+    async def run(user: VirtualUser, deadline: float):
+        while time.perf_counter() < deadline:
+            scenario = user.rng.choices(scenarios, weights)[0]
+            start = time.perf_counter()
+            response = await user.request(scenario)
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                errors[scenario] += 1
+            else:
+                samples[scenario].append(elapsed)
+
+    if args.warmup:
+        await asyncio.gather(*(
+            run(user, time.perf_counter() + args.warmup) for user in virtual_users
+        ))
+        samples = {name: [] for name in scenarios}
+        errors = {name: 0 for name in scenarios}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run(user, start + args.duration) for user in virtual_users
+    ))
+    seconds = time.perf_counter() - start
+
+    results = {
+        name: summarize(samples[name], errors[name], seconds) for name in scenarios
+    }
+    results["total"] = summarize(
+        [value for values in samples.values() for value in values],
+        sum(errors.values()),
+        seconds,
+    )
+    return results
+
+
+async def run_in_process(users, args) -> dict:
+    import httpx
+    import main
+
+    # ASGITransport skips the lifespan; run it like the server would.
+    async with main.lifespan(main.app):
+        # Unhandled errors become 500s, as behind a real server.
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await drive(client, users, args)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_against_server(users, args) -> dict:
+    import httpx
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND,
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            for _ in range(300):
+                try:
+                    await client.get("/metrics")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            return await drive(client, users, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+# -----------------------------
+# BASELINE
+# -----------------------------
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Scenarios whose p95 rose or whose throughput fell beyond tolerance."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        expected = baseline["scenarios"].get(name)
+        if not expected or current["requests"] < 20 or expected["requests"] < 20:
+            continue  # too few samples to judge
+        if current["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']}ms vs baseline {expected['p95_ms']}ms"
+            )
+        if current["rps"] < expected["rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {current['rps']} req/s vs baseline {expected['rps']} req/s"
+            )
+    return regressions
+
+
+def print_table(scenarios: dict):
+    print(f"{'scenario':<16}{'requests':>9}{'errors':>8}{'req/s':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, row in scenarios.items():
+        print(f"{name:<16}{row['requests']:>9}{row['errors']:>8}{row['rps']:>9}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="seeded users")
+    parser.add_argument("--items", type=int, default=200, help="seeded items per user")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds first")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", default=",".join(WEIGHTS),
+                        help="comma-separated subset of: " + ", ".join(WEIGHTS))
+    parser.add_argument("--db-mode", choices=("async", "sync"), default="async")
+    parser.add_argument("--server", action="store_true", help="run real uvicorn workers")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers with --server")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--check", action="store_true", help="exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+    args.scenarios = set(args.scenarios.split(","))
+    unknown = args.scenarios - set(WEIGHTS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+def prepare_environment(db_mode: str) -> str:
+    """Point the app at a fresh temporary database; returns its URL.
+
+    Must run before the app modules are imported: they read their
+    settings at import time.
+    """
+    workdir = tempfile.mkdtemp(prefix="study_planner_bench_")
+    database_url = f"sqlite:///{workdir}/bench.db"
+    os.environ.update({
+        "DATABASE_URL": database_url,
+        "DATABASE_MODE": db_mode,
+        "AI_MODEL": "fake",
+        "STREAK_EXPIRY_ENABLED": "false",
+        # Measures the app at full tilt, not how fast it turns clients away.
+        "RATE_LIMIT_ENABLED": "false",
+        "PDF_SPOOL_DIR": os.path.join(workdir, "spool"),
+        "LOG_LEVEL": "WARNING",
+    })
+    sys.path.insert(0, str(BACKEND))
+    return database_url
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = prepare_environment(args.db_mode)
+
+    from benchmarks.seed import seed
+
+    started = time.perf_counter()
+    users = seed(database_url, args.users, args.items, args.seed)
+    seed_seconds = time.perf_counter() - started
+
+    runner = run_against_server if args.server else run_in_process
+    scenarios = asyncio.run(runner(users, args))
+
+    results = {
+        "meta": {
+            "mode": f"uvicorn x{args.workers}" if args.server else "asgi",
+            "db_mode": args.db_mode,
+            "users": args.users,
+            "items_per_user": args.items,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "seed_seconds": round(seed_seconds, 2),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "scenarios": scenarios,
+    }
+
+    print_table(scenarios)
+    Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline saved to {BASELINE}")
+        return 0
+
+    if BASELINE.exists():
+        regressions = compare(results, json.loads(BASELINE.read_text()), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions and args.check:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+import activity
+import auth
+import models
+import stats
+from database import build_engine
+from migrations import init_db
+
+
+PASSWORD = "benchmark-password"
+
+# Enough distinct words for full-text search to have something to rank.
+TOPICS = [
+    "algebra", "biology", "chemistry", "economics", "genetics", "geometry",
+    "history", "literature", "optics", "photosynthesis", "statistics", "thermodynamics",
+]
+
+
+def email_for(index: int) -> str:
+    return f"bench{index}@example.com"
+
+
+def seed(url: str, users: int, items_per_user: int, random_seed: int = 42) -> list[tuple[str, list[int]]]:
+    """Fill an empty database; returns (email, item ids) per user.
+
+    The same arguments always produce the same rows, so runs compare.
+    """
+    rng = random.Random(random_seed)
+    today = date.today()
+    bind = build_engine(url)
+    init_db(bind)
+
+    # One bcrypt round for everybody: seeding measures nothing.
+    hashed = auth.hash_password(PASSWORD)
+
+    with Session(bind) as db:
+        db.execute(insert(models.User), [
+            {
+                "email": email_for(i),
+                "hashed_password": hashed,
+                "current_streak": rng.randint(0, 30),
+                "last_completed_date": today - timedelta(days=rng.randint(0, 3)),
+            }
+            for i in range(users)
+        ])
+        user_ids = db.scalars(select(models.User.id).order_by(models.User.id)).all()
+
+        items = []
+        for user_id in user_ids:
+            for n in range(items_per_user):
+                completed = rng.random() < 0.4
+                items.append({
+                    "title": f"{rng.choice(TOPICS).capitalize()} item {n}",
+                    "description": f"Review {rng.choice(TOPICS)} notes",
+                    "type": "task" if rng.random() < 0.7 else "plan",
+                    "completed": completed,
+                    "completed_date": (
+                        today - timedelta(days=rng.randint(0, 60)) if completed else None
+                    ),
+                    "owner_id": user_id,
+                })
+        if items:
+            db.execute(insert(models.StudyItem), items)
+
+        owned = {user_id: [] for user_id in user_ids}
+        for item_id, owner_id in db.execute(
+            select(models.StudyItem.id, models.StudyItem.owner_id)
+            .order_by(models.StudyItem.id)
+        ):
+            owned[owner_id].append(item_id)
+
+        db.commit()
+        stats.rebuild_all(db)
+        activity.rebuild_all(db)
+
+    bind.dispose()
+    return [(email_for(i), owned[user_id]) for i, user_id in enumerate(user_ids)]
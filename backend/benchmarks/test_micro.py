@@ -0,0 +1,209 @@
+"""Micro-benchmarks (pytest-benchmark): ``python -m pytest benchmarks``.
+
+Needs the test dependencies: ``pip install -r requirements-dev.txt``.
+
+Compare runs with ``--benchmark-autosave`` and ``--benchmark-compare``.
+"""
+import json
+from datetime import date, timedelta
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+import models
+import schemas
+from streaks import update_user_streak
+
+
+TODAY = date.today()
+
+STREAK_CASES = {
+    "first_completion": None,
+    "same_day": TODAY,
+    "consecutive_day": TODAY - timedelta(days=1),
+    "missed_days": TODAY - timedelta(days=5),
+}
+
+
+@pytest.mark.parametrize("case", STREAK_CASES)
+def test_update_user_streak(benchmark, case):
+    def setup():
+        user = models.User(current_streak=7, last_completed_date=STREAK_CASES[case])
+        return (user,), {}
+
+    benchmark.pedantic(update_user_streak, setup=setup, rounds=2000)
+
+
+def _rows(count: int = 500) -> list[dict]:
+    # What the list endpoint's column select returns, one page at the cap.
+    return [
+        {
+            "id": n,
+            "title": f"Chapter {n} review",
+            "description": "Re-read the notes and do the exercises",
+            "type": "task" if n % 3 else "plan",
+            "completed": n % 2 == 0,
+            "completed_date": TODAY if n % 2 == 0 else None,
+        }
+        for n in range(1, count + 1)
+    ]
+
+
+def test_validate_study_items(benchmark):
+    adapter = TypeAdapter(list[schemas.StudyItemResponse])
+    rows = _rows()
+
+    items = benchmark(adapter.validate_python, rows)
+    assert len(items) == 500
+
+
+def test_serialize_study_items_response_model(benchmark):
+    # FastAPI's response_model path: validate, dump, encode, render.
+    adapter = TypeAdapter(list[schemas.StudyItemResponse])
+    rows = _rows()
+
+    def serialize():
+        items = adapter.validate_python(rows)
+        return JSONResponse(jsonable_encoder(adapter.dump_python(items))).body
+
+    body = benchmark(serialize)
+    assert len(json.loads(body)) == 500
+
+
+def test_serialize_study_items_projection(benchmark):
+    rows = [{"id": row["id"], "title": row["title"]} for row in _rows()]
+
+    body = benchmark(lambda: JSONResponse(content=rows).body)
+    assert len(json.loads(body)) == 500
+
+
+def test_serialize_dashboard(benchmark):
+    payload = {
+        "progress": {
+            "total_tasks": 120,
+            "completed_tasks": 80,
+            "pending_tasks": 40,
+            "completion_percentage": 66.67,
+        },
+        "streak": {"current_streak": 12, "last_completed_date": TODAY},
+        "plans": {"total_plans": 9},
+    }
+
+    benchmark(lambda: JSONResponse(jsonable_encoder(payload)).body)
+
+
+def test_serialize_study_items_rows_to_json(benchmark):
+    # The list endpoint now: column tuples straight to bytes with orjson.
+    from responses import rows_to_json
+
+    columns = tuple(schemas.StudyItemResponse.model_fields)
+    rows = [tuple(row[name] for name in columns) for row in _rows()]
+
+    body = benchmark(rows_to_json, columns, rows)
+    assert len(json.loads(body)) == 500
+
+
+def test_serialize_dashboard_orjson(benchmark):
+    from responses import ORJSONResponse
+
+    payload = {
+        "progress": {
+            "total_tasks": 120,
+            "completed_tasks": 80,
+            "pending_tasks": 40,
+            "completion_percentage": 66.67,
+        },
+        "streak": {"current_streak": 12, "last_completed_date": TODAY},
+        "plans": {"total_plans": 9},
+    }
+
+    benchmark(lambda: ORJSONResponse(jsonable_encoder(payload)).body)
+
+
+@pytest.fixture(scope="module")
+def leaderboard_index():
+    from ranking import LeaderboardIndex
+
+    index = LeaderboardIndex()
+    index.load((n, f"user{n}@example.com", n % 40) for n in range(1, 10_001))
+    return index
+
+
+def test_leaderboard_page_dicts(benchmark, leaderboard_index):
+    # Before: a fresh page of dicts encoded by the json module every time.
+    benchmark(lambda: JSONResponse(leaderboard_index.top(100)).body)
+
+
+def test_leaderboard_page_cached_bytes(benchmark, leaderboard_index):
+    benchmark(leaderboard_index.top_json, 100)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_compress_study_items_page(benchmark, encoding):
+    import compression
+    from responses import rows_to_json
+
+    if encoding == "br" and compression.brotli is None:
+        pytest.skip("brotli is not installed")
+
+    columns = tuple(schemas.StudyItemResponse.model_fields)
+    body = rows_to_json(columns, [tuple(row[name] for name in columns) for row in _rows()])
+
+    compressed = benchmark(compression.compress, body, encoding)
+    benchmark.extra_info["ratio"] = round(len(body) / len(compressed), 1)
+
+
+# A common topic word (in about a sixth of items) and a rare token.
+SEARCH_TERMS = ["genetics", "12345"]
+
+
+@pytest.fixture(scope="module")
+def search_db(tmp_path_factory):
+    # One user with thousands of notes: where a client-side filter gives out.
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from benchmarks.seed import seed
+
+    url = f"sqlite:///{tmp_path_factory.mktemp('search') / 'search.db'}"
+    seed(url, users=1, items_per_user=20_000)
+    engine = create_engine(url)
+    with Session(engine) as db:
+        yield db
+    engine.dispose()
+
+
+@pytest.mark.parametrize("term", SEARCH_TERMS)
+def test_search_like_scan(benchmark, search_db, term):
+    # Substring match over every row the user owns; no ranking.
+    from sqlalchemy import or_, select
+
+    item = models.StudyItem
+    pattern = f"%{term}%"
+    statement = select(item.id, item.title).where(
+        item.owner_id == 1,
+        or_(item.title.ilike(pattern), item.description.ilike(pattern)),
+    )
+
+    benchmark(lambda: search_db.execute(statement).all())
+
+
+@pytest.mark.parametrize("term", SEARCH_TERMS)
+def test_search_fts(benchmark, search_db, term):
+    # bm25-ranked first page with snippets, as GET /study-items/search runs it.
+    import search
+
+    statement = search.search_statement("sqlite", 1, term).limit(20)
+
+    benchmark(lambda: search_db.execute(statement).all())
+
+
+def test_rate_limit_check(benchmark):
+    from ratelimit import Limit, Limiter
+
+    limiter = Limiter(enabled=True)
+    limiter.caller = limiter.everyone["ai"] = Limit(capacity=1e12, per_second=1e12)
+
+    benchmark(limiter.check, "ai", "user:1", 10)
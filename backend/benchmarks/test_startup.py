@@ -0,0 +1,15 @@
+import os
+
+from tests.test_startup import import_times, startup_env
+
+# Cumulative `import main` time allowed in a fresh interpreter. Wall-clock,
+# so it runs with the benchmarks rather than in the default suite.
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "2500"))
+
+
+def test_app_import_within_budget(tmp_path):
+    times = import_times("main", startup_env(tmp_path / "startup.db"))
+
+    assert times["main"] / 1000 < STARTUP_BUDGET_MS, (
+        f"import main took {times['main'] / 1000:.0f} ms"
+    )
@@ -0,0 +1,148 @@
+"""Export and import throughput for one user with many items.
+
+    python -m benchmarks.transfer                     # 100k items
+    python -m benchmarks.transfer --items 250000 --db-mode sync
+
+Run from backend/. The app is called as a plain ASGI callable whose
+``send`` counts and drops the body, so the traced peak is the server's
+own memory: for the streamed export it should not grow with --items.
+"""
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+
+
+async def call(
+    app, method: str, path: str, headers: dict, body: bytes = b"", keep_body: bool = False
+) -> dict:
+    """Run one request; the response body is only collected with ``keep_body``."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    result = {"status": None, "bytes": 0, "chunks": 0, "body": bytearray()}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            result["bytes"] += len(chunk)
+            result["chunks"] += 1
+            if keep_body:
+                result["body"] += chunk
+
+    await app(scope, receive, send)
+    disconnected.set()
+    return result
+
+
+async def measure(app, method, path, headers, body=b"", trace=False) -> tuple[dict, float, float]:
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    # Small upload responses are kept; downloads are only counted.
+    result = await call(app, method, path, headers, body, keep_body=method != "GET")
+    seconds = time.perf_counter() - start
+    peak = 0.0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    if result["status"] != 200:
+        raise RuntimeError(f"{method} {path}: {result['status']} {bytes(result['body'][:200])}")
+    return result, seconds, peak
+
+
+def multipart(filename: str, content: bytes) -> tuple[dict, bytes]:
+    import httpx
+
+    request = httpx.Request("POST", "http://bench/", files={"file": (filename, content)})
+    return {"Content-Type": request.headers["Content-Type"]}, request.read()
+
+
+async def run(email: str, items: int) -> list[dict]:
+    import auth
+    import main
+
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': email})}"}
+    rows = []
+
+    async with main.lifespan(main.app):
+        exported = {}
+        for format in ("ndjson", "csv"):
+            path = f"/study-items/export?format={format}"
+            result, seconds, _ = await measure(main.app, "GET", path, headers)
+            _, _, peak = await measure(main.app, "GET", path, headers, trace=True)
+            # Kept once, outside the measured runs, to feed the import.
+            exported[format] = bytes(
+                (await call(main.app, "GET", path, headers, keep_body=True))["body"]
+            )
+            rows.append({
+                "operation": f"export {format}", "rows": items, "mb": result["bytes"] / 1e6,
+                "seconds": seconds, "peak_mb": peak, "chunks": result["chunks"],
+            })
+
+        for format, content in exported.items():
+            upload_headers, body = multipart(f"items.{format}", content)
+            result, seconds, _ = await measure(
+                main.app, "POST", "/study-items/import", {**headers, **upload_headers}, body
+            )
+            _, _, peak = await measure(
+                main.app, "POST", "/study-items/import", {**headers, **upload_headers}, body,
+                trace=True,
+            )
+            rows.append({
+                "operation": f"import {format}", "rows": items, "mb": len(body) / 1e6,
+                "seconds": seconds, "peak_mb": peak, "chunks": None,
+            })
+    return rows
+
+
+def main(argv=None):
+    from benchmarks.load import prepare_environment
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--db-mode", choices=("async", "sync"), default="async")
+    args = parser.parse_args(argv)
+
+    database_url = prepare_environment(args.db_mode)
+
+    from benchmarks.seed import seed
+
+    [(email, _)] = seed(database_url, 1, args.items)
+    rows = asyncio.run(run(email, args.items))
+
+    print(f"{'operation':<16}{'rows':>9}{'MB':>8}{'seconds':>9}{'rows/s':>10}{'peak MB':>9}")
+    for row in rows:
+        print(f"{row['operation']:<16}{row['rows']:>9}{row['mb']:>8.1f}{row['seconds']:>9.2f}"
+              f"{row['rows'] / row['seconds']:>10.0f}{row['peak_mb']:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
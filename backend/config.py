@@ -1,7 +1,4 @@
-import google.generativeai as genai
-import os
 from dotenv import load_dotenv
 
+# Imported first by main.py so .env applies to every module's settings.
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
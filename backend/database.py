@@ -1,13 +1,234 @@
-from sqlalchemy import create_engine
+import logging
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("database")
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes", "on")
+
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./study_planner.db")
+
+# "async": routes talk to the database through an AsyncSession on the
+# event loop (aiosqlite / asyncpg). "sync": routes get a blocking Session
+# wrapped in SyncSession, each call run in the threadpool.
+DATABASE_MODE = os.getenv("DATABASE_MODE", "async")
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", "false")
+
+# Applied to every new SQLite connection. WAL lets readers proceed while
+# /complete or /register hold the write lock; NORMAL is durable in WAL
+# mode except for the last transactions on power loss.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-20000")),  # negative = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+}
+
+# Driver used for the async engine of each backend.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def _is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory_sqlite(url) -> bool:
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
 
-DATABASE_URL = "sqlite:///./study_planner.db"
+def _connect_args(url) -> dict:
+    if _is_sqlite(url):
+        return {"check_same_thread": False}
+    return {}
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+
+def _engine_options(url) -> dict:
+    options = {
+        "connect_args": _connect_args(url),
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    # In-memory SQLite uses a single-connection pool without sizing.
+    if not _is_memory_sqlite(url):
+        options["pool_size"] = DB_POOL_SIZE
+        options["max_overflow"] = DB_MAX_OVERFLOW
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def build_engine(url: str):
+    bind = create_engine(url, **_engine_options(url))
+    if _is_sqlite(url):
+        event.listen(bind, "connect", _apply_sqlite_pragmas)
+    return bind
+
+
+engine = build_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+
+def describe_engine(bind=None) -> dict:
+    """Effective settings, read back from a live connection for SQLite."""
+    bind = bind or engine
+    options = _engine_options(bind.url)
+    settings = {
+        "url": bind.url.render_as_string(hide_password=True),
+        "mode": DATABASE_MODE,
+        "pool": type(bind.pool).__name__,
+        "pool_size": options.get("pool_size"),
+        "max_overflow": options.get("max_overflow"),
+        "pool_pre_ping": options["pool_pre_ping"],
+    }
+
+    if bind.dialect.name == "sqlite":
+        with bind.connect() as conn:
+            for name in SQLITE_PRAGMAS:
+                settings[name] = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+    return settings
+
+
+def log_settings():
+    logger.info(
+        "database: %s",
+        ", ".join(f"{key}={value}" for key, value in describe_engine().items())
+    )
+
+
+# -----------------------------
+# ASYNC ENGINE
+# -----------------------------
+_async_sessionmaker = None
+
+
+def async_url(url) -> str:
+    url = make_url(url)
+    if "+" in url.drivername:
+        return url.render_as_string(hide_password=False)
+    return url.set(
+        drivername=ASYNC_DRIVERS[url.get_backend_name()]
+    ).render_as_string(hide_password=False)
+
+
+def get_async_sessionmaker():
+    # Created on first use so sync-only processes (tests, CLI jobs)
+    # never import the async driver.
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async_engine = create_async_engine(
+            async_url(DATABASE_URL), **_engine_options(DATABASE_URL)
+        )
+        if _is_sqlite(DATABASE_URL):
+            event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        _async_sessionmaker = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker
+
+
+def open_session():
+    """Session for the configured DATABASE_MODE, usable with ``async with``."""
+    if DATABASE_MODE == "async":
+        return get_async_sessionmaker()()
+    return SyncSession(SessionLocal())
+
+
+# -----------------------------
+# SYNC SESSION ADAPTER
+# -----------------------------
+def _execute_buffered(session, statement, params=None, execution_options=None, **kw):
+    # Fetch rows while still on the worker thread, like AsyncSession does.
+    execution_options = {**(execution_options or {}), "prebuffer_rows": True}
+    return session.execute(
+        statement, params, execution_options=execution_options, **kw
+    )
+
+
+class SyncSession:
+    """Await-able facade over a blocking Session.
+
+    Mirrors the subset of the AsyncSession API the routers use, so the same
+    async route code runs against either engine.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.bind
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kw):
+        return await run_in_threadpool(
+            _execute_buffered, self.sync_session, statement, params, **kw
+        )
+
+    async def scalar(self, statement, params=None, **kw):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kw)
+
+    async def scalars(self, statement, params=None, **kw):
+        result = await self.execute(statement, params, **kw)
+        return result.scalars()
+
+    async def get(self, entity, ident, **kw):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kw)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kw):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kw)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -1,9 +1,45 @@
-from database import SessionLocal
-from fastapi import Depends
+import time
 
-def get_db():
-    db = SessionLocal()
-    try:
+from database import open_session
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models, schemas, user_cache
+from auth import oauth2_scheme, decode_access_token
+
+async def get_db():
+    async with open_session() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def get_current_user_record(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> schemas.CurrentUser:
+    # Hot path: a token we have already verified, for a user we have
+    # already loaded, costs no signature check and no query.
+    user_id = user_cache.tokens.get(token)
+    if user_id is not None:
+        record = user_cache.users.get(user_id)
+        if record is not None:
+            return record
+        user = await db.get(models.User, user_id)
+    else:
+        payload = decode_access_token(token)
+        user = await db.scalar(
+            select(models.User).where(
+                models.User.email == payload.get("sub")
+            )
+        )
+        if user:
+            user_cache.tokens.set(
+                token, user.id, ttl=payload["exp"] - time.time()
+            )
+
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    record = schemas.CurrentUser.model_validate(user)
+    user_cache.users.set(user.id, record)
+    return record
@@ -0,0 +1,148 @@
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from metrics import Counter, Gauge, Histogram
+
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+request_latency = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the end of the response body, by route",
+    labelnames=("method", "route"),
+)
+requests_total = Counter(
+    "http_requests_total",
+    "Finished requests by route and status code",
+    labelnames=("method", "route", "status"),
+)
+requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being served",
+    labelnames=("method",),
+)
+request_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request, by route",
+    labelnames=("method", "route"),
+    buckets=QUERY_BUCKETS,
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request, by route",
+    labelnames=("method", "route"),
+)
+queries_total = Counter(
+    "db_queries_total",
+    "SQL statements executed, in or outside a request",
+)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Set per request; threadpool calls (SyncSession) inherit the context.
+_current = ContextVar("request_stats", default=None)
+
+
+def current_stats():
+    return _current.get()
+
+
+# -----------------------------
+# SQL COUNTING (every engine: app, async, tests)
+# -----------------------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    queries_total.inc()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _execute_failed(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+# -----------------------------
+# ASGI MIDDLEWARE
+# -----------------------------
+def _route_label(scope) -> str:
+    # The route template, not the raw path, keeps label cardinality bounded.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def server_timing(total: float, stats: RequestStats) -> str:
+    app_ms = max(total - stats.db_seconds, 0) * 1000
+    return (
+        f'app;dur={app_ms:.1f}, '
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+        f'total;dur={total * 1000:.1f}'
+    )
+
+
+class MetricsMiddleware:
+    """Per-route latency, status and SQL counts, plus a Server-Timing header.
+
+    Server-Timing is measured up to the response headers; for streamed
+    responses the histograms include the whole body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+        requests_in_progress.inc(method)
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = server_timing(time.perf_counter() - start, stats)
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"server-timing", timing.encode()),
+                    ],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = _route_label(scope)
+            request_latency.observe(time.perf_counter() - start, method, route)
+            request_queries.observe(stats.queries, method, route)
+            request_db_seconds.observe(stats.db_seconds, method, route)
+            requests_total.inc(method, route, str(status))
+            requests_in_progress.dec(method)
+            _current.reset(token)
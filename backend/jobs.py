@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal, engine
+from migrations import init_db
+import activity
+import ranking
+import search
+import stats
+import streaks
+import user_cache
+
+
+logger = logging.getLogger("jobs")
+
+# Local time of the nightly in-app streak expiry, "HH:MM".
+STREAK_EXPIRY_AT = os.getenv("STREAK_EXPIRY_AT", "00:05")
+
+
+def rebuild_stats():
+    with SessionLocal() as db:
+        return stats.rebuild_all(db)
+
+
+def expire_streaks():
+    with SessionLocal() as db:
+        return streaks.expire_stale_streaks(db)
+
+
+def rebuild_activity():
+    with SessionLocal() as db:
+        return activity.rebuild_all(db)
+
+
+def rebuild_search():
+    with SessionLocal() as db:
+        return search.rebuild(db)
+
+
+COMMANDS = {
+    "rebuild-stats": rebuild_stats,
+    "expire-streaks": expire_streaks,
+    "rebuild-search": rebuild_search,
+    "rebuild-activity": rebuild_activity,
+}
+
+
+def run_job(name: str) -> dict:
+    start = time.perf_counter()
+    rows = COMMANDS[name]()
+    report = {
+        "job": name,
+        "rows": rows,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    logger.info("%(job)s: %(rows)s rows in %(seconds).3fs", report)
+    return report
+
+
+def seconds_until(at: str, now: datetime = None) -> float:
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in at.split(":"))
+    next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+async def run_nightly_streak_expiry():
+    # Catch up on a missed night first, then run once a day.
+    nightly = False
+    while True:
+        try:
+            await run_in_threadpool(run_job, "expire-streaks")
+        except Exception:
+            logger.exception("expire-streaks failed")
+        # Every worker runs this, but only the first UPDATE finds any rows
+        # and that worker alone evicts them; the others drop their cached
+        # users and leaderboard so they don't serve the old streaks. The
+        # catch-up pass at startup keeps the leaderboard just warmed up.
+        if nightly:
+            user_cache.invalidate_all()
+            ranking.leaderboard.reset()
+        await asyncio.sleep(seconds_until(STREAK_EXPIRY_AT))
+        nightly = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Smart Study Planner maintenance jobs")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    init_db(engine)
+    run_job(args.command)
+
+
+if __name__ == "__main__":
+    main()
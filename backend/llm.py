@@ -0,0 +1,85 @@
+import asyncio
+import os
+import threading
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+
+
+# "fake" swaps Gemini for FakeModel: no network, no API key, no quota.
+AI_MODEL = os.getenv("AI_MODEL", "gemini")
+#  Use EXACT model name from list_models()
+MODEL_NAME = "models/gemini-flash-latest"
+
+_model = None
+_model_lock = threading.Lock()
+
+
+class _FakeStream:
+    def __init__(self, chunks, delay: float):
+        self._chunks = chunks
+        self._delay = delay
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(self._delay)
+            yield SimpleNamespace(text=chunk)
+
+
+class FakeModel:
+    """Offline stand-in for genai.GenerativeModel with the same call shapes."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def _answer(self, contents) -> str:
+        if not contents:
+            raise TypeError("contents must not be empty")
+        self.calls += 1
+        prompt = " ".join(str(contents).split())
+        return f"[fake answer] {prompt[:200]}"
+
+    def generate_content(self, contents, **kwargs):
+        return SimpleNamespace(text=self._answer(contents))
+
+    async def generate_content_async(self, contents, *, stream: bool = False, **kwargs):
+        text = self._answer(contents)
+        if stream:
+            words = text.split(" ")
+            return _FakeStream(
+                [word + " " for word in words[:-1]] + words[-1:], self.delay
+            )
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(text=text)
+
+
+# -----------------------------
+# SHARED CLIENT
+# -----------------------------
+def _build_model():
+    if AI_MODEL == "fake":
+        return FakeModel()
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise HTTPException(status_code=503, detail="GEMINI_API_KEY not set")
+
+    # Imported here: the SDK (grpc, protobuf) is the slowest import of the app.
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(MODEL_NAME)
+
+
+def get_model():
+    """The process-wide model client, created on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _build_model()
+    return _model
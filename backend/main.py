@@ -1,12 +1,55 @@
+import config  # loads .env before any module reads its settings
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from database import Base, engine
-from routers import auth, leaderboard, ai, pdf, dashboard, study_items
-import config 
+from database import engine, log_settings, open_session
+from migrations import init_db
+from routers import auth, leaderboard, ai, pdf, dashboard, analytics, study_items, metrics, admin
+from compression import CompressionMiddleware
+from instrumentation import MetricsMiddleware
+from profiling import PROFILING_ENABLED, ProfilingMiddleware
+import jobs
+import pdf_extract
+import pdf_jobs
+import ranking
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema setup runs at startup, not import, so importing the app
+    # (tests, tooling, worker boot) does no DDL.
+    await run_in_threadpool(init_db, engine)
+    await run_in_threadpool(log_settings)
+
+    # Warm the in-memory leaderboard before the first request.
+    async with open_session() as db:
+        await db.run_sync(ranking.leaderboard.rebuild)
+
+    # Resume PDF jobs queued or interrupted before the last shutdown.
+    await pdf_jobs.queue.start()
+
+    expiry = None
+    if os.getenv("STREAK_EXPIRY_ENABLED", "true").lower() in ("1", "true", "yes", "on"):
+        expiry = asyncio.create_task(jobs.run_nightly_streak_expiry())
+
+    yield
+
+    if expiry:
+        expiry.cancel()
+        with suppress(asyncio.CancelledError):
+            await expiry
+    await pdf_jobs.queue.stop()
+    pdf_extract.shutdown()
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Smart Study Planner")
+app = FastAPI(title="Smart Study Planner", lifespan=lifespan)
 
 # --- Integration ---
 origins = [
@@ -20,7 +63,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(CompressionMiddleware)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+# Outermost, so latency covers every other middleware.
+app.add_middleware(MetricsMiddleware)
 # ------------------------
 
 app.include_router(auth.router)
@@ -29,3 +78,6 @@ app.include_router(leaderboard.router)
 app.include_router(ai.router)
 app.include_router(pdf.router)
 app.include_router(dashboard.router)
+app.include_router(analytics.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
@@ -0,0 +1,47 @@
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+import activity
+import models  # registers tables on Base.metadata
+import search
+from database import Base
+
+
+def _add_missing_columns(conn, existing: set):
+    # ALTER TABLE ... ADD COLUMN: new columns must be nullable or carry a
+    # server_default, so rows already in the table get a value.
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in present:
+                spec = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {spec}")
+
+
+def init_db(bind: Engine):
+    """Create or upgrade the schema of an existing database in place.
+
+    ``create_all`` only creates missing tables, so columns and indexes
+    added to tables that already exist (e.g. an old study_planner.db) are
+    created here, and derived tables new to the database are backfilled.
+    Every step is idempotent and safe to run on each startup.
+    """
+    existing = set(inspect(bind).get_table_names())
+    Base.metadata.create_all(bind=bind)
+
+    with bind.begin() as conn:
+        _add_missing_columns(conn, existing)
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+        if bind.dialect.name == "sqlite":
+            search.create_sqlite_index(conn)
+
+        if models.DailyActivity.__tablename__ not in existing:
+            activity.backfill(conn)
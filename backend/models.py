@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, Date, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from database import Base
-from datetime import date
+from datetime import date, datetime
 
 
 class User(Base):
@@ -11,11 +11,12 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
 
-    current_streak = Column(Integer, default=0)
+    current_streak = Column(Integer, default=0, index=True)
     last_completed_date = Column(Date, nullable=True)
 
     # Relationships
     study_items = relationship("StudyItem", back_populates="owner")
+    stats = relationship("UserStats", uselist=False, back_populates="user")
 
 
 class StudyItem(Base):
@@ -32,6 +33,68 @@ class StudyItem(Base):
     owner_id = Column(Integer, ForeignKey("users.id"))
     owner = relationship("User", back_populates="study_items")
 
+    __table_args__ = (
+        # listing / dashboard counts filter on all three
+        Index("ix_study_items_owner_type_completed", "owner_id", "type", "completed"),
+        # single-item lookups and id-ordered listings
+        Index("ix_study_items_owner_id_id", "owner_id", "id"),
+        # full-text search on Postgres; SQLite uses the FTS5 table in search.py
+        Index(
+            "ix_study_items_search",
+            text("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
 
 
+class UserStats(Base):
+    __tablename__ = "user_stats"
 
+    # Maintained by the study item handlers, rebuilt by `jobs.py rebuild-stats`
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_tasks = Column(Integer, default=0, nullable=False)
+    completed_tasks = Column(Integer, default=0, nullable=False)
+    total_plans = Column(Integer, default=0, nullable=False)
+    completed_plans = Column(Integer, default=0, nullable=False)
+    # Bumped by every study item write; the user's ETags are built from it
+    revision = Column(Integer, default=0, server_default="0", nullable=False)
+
+    user = relationship("User", back_populates="stats")
+
+
+class DailyActivity(Base):
+    __tablename__ = "daily_activity"
+
+    # Completions per user and day, keyed by completed_date. Maintained by
+    # the study item handlers, rebuilt by `jobs.py rebuild-activity`
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    completed_tasks = Column(Integer, default=0, nullable=False)
+    completed_plans = Column(Integer, default=0, nullable=False)
+
+
+class PdfJob(Base):
+    __tablename__ = "pdf_jobs"
+
+    id = Column(String, primary_key=True)  # uuid4 hex, handed to the uploaders
+    # Identical uploads share one job; who uploaded it is in pdf_job_uploads
+    file_hash = Column(String, unique=True, nullable=False)
+    spool_path = Column(String)
+    status = Column(String, nullable=False, default="queued", index=True)  # queued, running, done, failed
+    summary = Column(Text)
+    error = Column(String)
+
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    # Touched by the worker running the job; a stale one means it died
+    heartbeat_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+
+class PdfJobUpload(Base):
+    __tablename__ = "pdf_job_uploads"
+
+    # One row per user who submitted a job, with the name they uploaded it under
+    job_id = Column(String, ForeignKey("pdf_jobs.id"), primary_key=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    filename = Column(String)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from cache import TTLCache
+
+
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(20 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "500"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Pages handed to one worker; smaller documents are extracted in one task.
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+# sha256 of the file -> extracted text
+text_cache = TTLCache(
+    maxsize=int(os.getenv("PDF_TEXT_CACHE_SIZE", "64")),
+    ttl=float(os.getenv("PDF_TEXT_CACHE_TTL", "86400")),
+)
+
+_executor = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    # spawn: forking a process that already runs threads is unsafe.
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+# -----------------------------
+# WORKER FUNCTIONS (run in the process pool)
+# -----------------------------
+def _page_count(path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(path).pages)
+
+
+def _extract_range(path: str, start: int, stop: int) -> list[str]:
+    from pypdf import PdfReader
+
+    pages = PdfReader(path).pages
+    return [pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+# -----------------------------
+# ASYNC API
+# -----------------------------
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"PDF larger than {PDF_MAX_BYTES} bytes"
+    )
+
+
+async def read_upload(file: UploadFile) -> bytes:
+    """Read an upload, rejecting it as soon as it passes PDF_MAX_BYTES."""
+    chunks = []
+    size = 0
+    while chunk := await file.read(1024 * 1024):
+        size += len(chunk)
+        if size > PDF_MAX_BYTES:
+            raise _too_large()
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def spool_upload(file: UploadFile, directory: str) -> tuple[str, str]:
+    """Stream an upload to ``directory/<sha256>.pdf``; returns (path, digest)."""
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    spooled = tempfile.NamedTemporaryFile(dir=directory, suffix=".part", delete=False)
+    try:
+        with spooled:
+            while chunk := await file.read(1024 * 1024):
+                size += len(chunk)
+                if size > PDF_MAX_BYTES:
+                    raise _too_large()
+                digest.update(chunk)
+                await run_in_threadpool(spooled.write, chunk)
+        path = os.path.join(directory, f"{digest.hexdigest()}.pdf")
+        os.replace(spooled.name, path)
+    except BaseException:
+        os.unlink(spooled.name)
+        raise
+    return path, digest.hexdigest()
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def extract_text_from_path(path: str) -> str:
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+
+    try:
+        page_count = await loop.run_in_executor(executor, _page_count, path)
+    except Exception:
+        raise HTTPException(status_code=400, detail="File is not a readable PDF")
+
+    if page_count > PDF_MAX_PAGES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"PDF has more than {PDF_MAX_PAGES} pages"
+        )
+
+    ranges = [
+        (start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_TASK)
+    ]
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(executor, _extract_range, path, start, stop)
+        for start, stop in ranges
+    ))
+
+    return "\n".join(
+        text for pages in parts for text in pages if text
+    )
+
+
+async def extract_spooled_text(path: str, digest: str) -> str:
+    text = text_cache.get(digest)
+    if text is None:
+        text = await extract_text_from_path(path)
+        text_cache.set(digest, text)
+    return text
+
+
+async def extract_text(data: bytes) -> str:
+    """Extract a PDF's text off the event loop, cached by content hash."""
+    digest = file_digest(data)
+    text = text_cache.get(digest)
+    if text is not None:
+        return text
+
+    # Workers read the file from disk instead of unpickling the bytes.
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spooled:
+        spooled.write(data)
+    try:
+        text = await extract_text_from_path(spooled.name)
+    finally:
+        os.unlink(spooled.name)
+
+    text_cache.set(digest, text)
+    return text
@@ -0,0 +1,242 @@
+import asyncio
+import contextvars
+import logging
+import os
+import tempfile
+import uuid
+from contextlib import suppress
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+import models
+import pdf_extract
+from database import open_session
+from llm import MODEL_NAME, get_model
+from summarizer import Summarizer
+
+
+logger = logging.getLogger("pdf_jobs")
+
+# Summaries processed at once; extraction itself fans out to the pdf_extract pool.
+PDF_JOB_WORKERS = int(os.getenv("PDF_JOB_WORKERS", "2"))
+PDF_SPOOL_DIR = os.getenv(
+    "PDF_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "study_planner_pdf")
+)
+
+# A running job's worker touches heartbeat_at this often; a job not
+# touched for PDF_JOB_STALE_SECONDS is taken to have lost its worker.
+PDF_JOB_HEARTBEAT_SECONDS = float(os.getenv("PDF_JOB_HEARTBEAT_SECONDS", "30"))
+PDF_JOB_STALE_SECONDS = float(os.getenv("PDF_JOB_STALE_SECONDS", "120"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def _remove(path: str):
+    if path:
+        with suppress(FileNotFoundError):
+            os.unlink(path)
+
+
+class JobQueue:
+    """In-process queue of PdfJob ids; state lives in the pdf_jobs table."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        # Swapped by the tests to reach their own engine.
+        self.session_factory = open_session
+        self.progress = {}  # job id -> (done, total) while running
+        self._loop = None
+        self._queue = None
+        self._tasks = []
+
+    def _ensure_workers(self):
+        # Workers belong to the loop that serves requests; a new loop
+        # (e.g. a restarted app) gets a fresh queue.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            # A fresh context, so workers started from a request don't
+            # inherit its per-request state (e.g. SQL counters).
+            self._tasks = [
+                loop.create_task(self._work(), context=contextvars.Context())
+                for _ in range(self.workers)
+            ]
+
+    def enqueue(self, job_id: str):
+        self._ensure_workers()
+        self._queue.put_nowait(job_id)
+
+    async def start(self):
+        """Start the workers and pick up jobs left over by the last run."""
+        self._ensure_workers()
+        async with self.session_factory() as db:
+            # Jobs whose worker died mid-run are started over; those still
+            # running in another worker keep their heartbeat fresh.
+            stale = datetime.now() - timedelta(seconds=PDF_JOB_STALE_SECONDS)
+            await db.execute(
+                update(models.PdfJob)
+                .where(
+                    models.PdfJob.status == RUNNING,
+                    or_(
+                        models.PdfJob.heartbeat_at.is_(None),
+                        models.PdfJob.heartbeat_at < stale
+                    )
+                )
+                .values(status=QUEUED)
+            )
+            await db.commit()
+            pending = (await db.scalars(
+                select(models.PdfJob.id)
+                .where(models.PdfJob.status == QUEUED)
+                .order_by(models.PdfJob.created_at)
+            )).all()
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        return len(pending)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._loop = self._queue = None
+        self._tasks = []
+
+    async def join(self):
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("pdf job %s failed unexpectedly", job_id)
+            finally:
+                self.progress.pop(job_id, None)
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        async with self.session_factory() as db:
+            # Claimed in one statement: every worker enqueues the queued
+            # jobs it finds on startup, and only one of them may run each.
+            claimed = (await db.execute(
+                update(models.PdfJob)
+                .where(models.PdfJob.id == job_id, models.PdfJob.status == QUEUED)
+                .values(status=RUNNING, heartbeat_at=datetime.now())
+                .returning(models.PdfJob.spool_path, models.PdfJob.file_hash)
+            )).first()
+            await db.commit()
+        if claimed is None:
+            return
+        path, digest = claimed
+
+        # No session is held open during the slow part.
+        values = {"status": DONE, "summary": None, "error": None}
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            values["summary"] = await self._summarize(job_id, path, digest)
+        except HTTPException as exc:
+            values.update(status=FAILED, error=exc.detail)
+        except Exception as exc:
+            values.update(status=FAILED, error=f"PDF summarization failed: {exc}")
+        finally:
+            heartbeat.cancel()
+        _remove(path)
+
+        async with self.session_factory() as db:
+            await db.execute(
+                update(models.PdfJob)
+                .where(models.PdfJob.id == job_id)
+                .values(spool_path=None, finished_at=datetime.now(), **values)
+            )
+            await db.commit()
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(PDF_JOB_HEARTBEAT_SECONDS)
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(
+                        update(models.PdfJob)
+                        .where(models.PdfJob.id == job_id)
+                        .values(heartbeat_at=datetime.now())
+                    )
+                    await db.commit()
+            except Exception:
+                logger.exception("pdf job %s heartbeat failed", job_id)
+
+    async def _summarize(self, job_id: str, path: str, digest: str) -> str:
+        text = await pdf_extract.extract_spooled_text(path, digest)
+        if not text.strip():
+            raise HTTPException(
+                status_code=400,
+                detail="No readable text found in PDF"
+            )
+
+        def report(done, total):
+            self.progress[job_id] = (done, total)
+
+        summarizer = Summarizer(get_model(), MODEL_NAME, on_progress=report)
+        return await summarizer.summarize(text)
+
+
+queue = JobQueue(PDF_JOB_WORKERS)
+
+
+async def _find(db, digest: str) -> models.PdfJob:
+    return await db.scalar(
+        select(models.PdfJob).where(models.PdfJob.file_hash == digest)
+    )
+
+
+async def _record_upload(db, job_id: str, owner_id: int, filename: str):
+    upload = await db.get(models.PdfJobUpload, (job_id, owner_id))
+    if upload is None:
+        db.add(models.PdfJobUpload(job_id=job_id, owner_id=owner_id, filename=filename))
+    else:
+        upload.filename = filename
+
+
+async def submit(db, path: str, digest: str, filename: str, owner_id: int) -> models.PdfJob:
+    """Job for a spooled file: an existing one for the same bytes, or a new one.
+
+    Either way ``owner_id`` is recorded as an uploader, under ``filename``.
+    """
+    job = await _find(db, digest)
+    # A failed job is retried when the same file is uploaded again.
+    run = job is None or job.status == FAILED
+    if job is None:
+        job = models.PdfJob(id=uuid.uuid4().hex, file_hash=digest)
+        db.add(job)
+    if run:
+        job.status = QUEUED
+        job.error = None
+        job.spool_path = path
+        job.finished_at = None
+    elif job.status == DONE:
+        _remove(path)  # the result is already stored
+
+    await _record_upload(db, job.id, owner_id, filename)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # The same file was submitted concurrently; share that job.
+        await db.rollback()
+        await _record_upload(db, (await _find(db, digest)).id, owner_id, filename)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # ...by the same user, whose other request recorded the upload.
+            await db.rollback()
+        return await _find(db, digest)
+
+    if run:
+        queue.enqueue(job.id)
+    return job
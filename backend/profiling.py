@@ -0,0 +1,229 @@
+import cProfile
+import heapq
+import hmac
+import io
+import itertools
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+
+# Off by default: the middleware is not even installed, so it costs nothing.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes", "on")
+# Fraction of requests profiled at random.
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+# When set, every request is profiled and kept if it took at least this long.
+PROFILING_SLOW_MS = float(os.getenv("PROFILING_SLOW_MS", "0"))
+# How many of the slowest profiles are kept.
+PROFILING_KEEP = int(os.getenv("PROFILING_KEEP", "50"))
+# Sent as X-Profile-Token: profiles that request and unlocks /admin/profiles.
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+
+TOKEN_HEADER = b"x-profile-token"
+
+
+def token_matches(value) -> bool:
+    return bool(PROFILING_TOKEN) and value is not None and hmac.compare_digest(
+        value, PROFILING_TOKEN
+    )
+
+
+class ProfileStore:
+    """The slowest kept profiles, a min-heap on duration bounded to maxlen."""
+
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._profiles = []  # (duration_ms, id, profile), fastest first
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, profile: dict):
+        entry = (profile["duration_ms"], profile["id"], profile)
+        with self._lock:
+            if len(self._profiles) < self.maxlen:
+                heapq.heappush(self._profiles, entry)
+            elif self._profiles:
+                # Drops the fastest, which may be the one just added.
+                heapq.heappushpop(self._profiles, entry)
+
+    def get(self, profile_id: int):
+        with self._lock:
+            for _, _, profile in self._profiles:
+                if profile["id"] == profile_id:
+                    return profile
+        return None
+
+    def summaries(self) -> list[dict]:
+        with self._lock:
+            entries = sorted(self._profiles, reverse=True)
+        return [
+            {key: value for key, value in profile.items() if key != "stats"}
+            for _, _, profile in entries
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+profiles = ProfileStore(PROFILING_KEEP)
+
+
+# -----------------------------
+# OUTPUT FORMATS
+# -----------------------------
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name  # built-in, e.g. <method 'execute' of 'sqlite3.Cursor'>
+    return f"{os.path.basename(filename)}:{line}:{name}"
+
+
+class _StatsSource:
+    # pstats.Stats accepts anything with create_stats() and .stats
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def to_pstats(stats: dict) -> bytes:
+    """The format of Stats.dump_stats; loads with pstats / snakeviz."""
+    return marshal.dumps(stats)
+
+
+def to_text(stats: dict, limit: int = 40, sort: str = "cumulative") -> str:
+    out = io.StringIO()
+    report = pstats.Stats(_StatsSource(stats), stream=out)
+    report.sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def to_collapsed(stats: dict) -> str:
+    """Collapsed stacks ("a;b;c <microseconds>") for flamegraph.pl/speedscope.
+
+    cProfile keeps caller->callee edges, not whole stacks, so each edge's
+    share of the callee's time is spread over the callee's own callees.
+    """
+    children = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, (_, _, _, edge_cumulative) in callers.items():
+            children.setdefault(caller, []).append((func, edge_cumulative))
+
+    lines = {}
+
+    def walk(func, stack, scale):
+        _, _, self_time, cumulative, _ = stats[func]
+        stack = stack + [_label(func)]
+        weight = int(self_time * scale * 1_000_000)
+        if weight:
+            key = ";".join(stack)
+            lines[key] = lines.get(key, 0) + weight
+        for child, edge_cumulative in children.get(func, ()):
+            if _label(child) in stack or not stats[child][3]:
+                continue  # recursion: already counted on this stack
+            walk(child, stack, scale * edge_cumulative / stats[child][3])
+
+    roots = [func for func, row in stats.items() if not row[4]]
+    for root in roots:
+        walk(root, [], 1.0)
+
+    return "".join(f"{stack} {weight}\n" for stack, weight in sorted(lines.items()))
+
+
+# -----------------------------
+# ASGI MIDDLEWARE
+# -----------------------------
+class ProfilingMiddleware:
+    """cProfile selected requests: by X-Profile-Token, sampled at random,
+    or all of them when a slow threshold is set, keeping the slow ones.
+
+    cProfile follows the event loop thread, so coroutines of other requests
+    running at the same time appear in a profile too, and work handed to
+    the threadpool does not. Only one request is profiled at a time.
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float = None,
+        slow_ms: float = None,
+        store: ProfileStore = None,
+    ):
+        self.app = app
+        self.sample_rate = PROFILING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.slow_ms = PROFILING_SLOW_MS if slow_ms is None else slow_ms
+        self.store = store or profiles
+        self._busy = False
+
+    def _trigger(self, scope):
+        if scope["path"].startswith("/admin/profiles"):
+            return None
+        for name, value in scope["headers"]:
+            if name == TOKEN_HEADER and token_matches(value.decode("latin-1")):
+                return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        if self.slow_ms > 0:
+            return "slow"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = None
+        if scope["type"] == "http" and not self._busy:
+            trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        profile_id = self.store.next_id()
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trigger == "header":
+                    message = {
+                        **message,
+                        "headers": [
+                            *message.get("headers", []),
+                            (b"x-profile-id", str(profile_id).encode()),
+                        ],
+                    }
+            await send(message)
+
+        profiler = cProfile.Profile()
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            self._busy = False
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            if trigger != "slow" or duration_ms >= self.slow_ms:
+                profiler.create_stats()
+                route = getattr(scope.get("route"), "path", None)
+                self.store.add({
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round(duration_ms, 2),
+                    "trigger": trigger,
+                    "started_at": started_at.isoformat(),
+                    "stats": profiler.stats,
+                })
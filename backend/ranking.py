@@ -0,0 +1,261 @@
+import math
+import os
+
+import orjson
+import random
+import threading
+import time
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+import models
+
+
+# Rebuild from the database after this many seconds, so workers of a
+# multi-process deployment converge on changes made by their siblings.
+LEADERBOARD_RESYNC_SECONDS = float(os.getenv("LEADERBOARD_RESYNC_SECONDS", "300"))
+
+_MAX_LEVELS = 32
+_MAX_CACHED_PAGES = 256
+_TAIL_KEY = (math.inf,)  # sorts after every (-streak, user_id) key
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, levels: int, width: int = 1):
+        self.key = key
+        self.next = [None] * levels
+        # width[level]: how many level-0 steps next[level] skips over
+        self.width = [width] * levels
+
+
+class RankedSkipList:
+    """Skip list with link widths: insert, remove, rank and index in O(log n)."""
+
+    def __init__(self):
+        self._tail = _Node(_TAIL_KEY, 0)
+        self._head = _Node(None, _MAX_LEVELS)
+        self._head.next = [self._tail] * _MAX_LEVELS
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _find(self, key):
+        # Last node strictly before `key` on every level, plus its position.
+        chain = [None] * _MAX_LEVELS
+        positions = [0] * _MAX_LEVELS
+        node, position = self._head, 0
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            positions[level] = position
+        return chain, positions
+
+    def insert(self, key):
+        chain, positions = self._find(key)
+        levels = 1
+        while levels < _MAX_LEVELS and random.random() < 0.5:
+            levels += 1
+
+        new = _Node(key, levels)
+        new_position = positions[0] + 1
+        for level in range(levels):
+            prev = chain[level]
+            skipped = new_position - positions[level]
+            new.next[level] = prev.next[level]
+            new.width[level] = prev.width[level] - skipped + 1
+            prev.next[level] = new
+            prev.width[level] = skipped
+        for level in range(levels, _MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        chain, _ = self._find(key)
+        node = chain[0].next[0]
+        if node.key != key:
+            raise KeyError(key)
+
+        for level in range(len(node.next)):
+            prev = chain[level]
+            prev.width[level] += node.width[level] - 1
+            prev.next[level] = node.next[level]
+        for level in range(len(node.next), _MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def rank(self, key) -> int:
+        """Number of keys strictly smaller than `key`."""
+        _, positions = self._find(key)
+        return positions[0]
+
+    def _node_at(self, index: int) -> _Node:
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        node, remaining = self._head, index + 1
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index: int):
+        return self._node_at(index).key
+
+    def iter_from(self, index: int):
+        if index >= self._size:
+            return
+        node = self._node_at(index)
+        while node is not self._tail:
+            yield node.key
+            node = node.next[0]
+
+
+class LeaderboardIndex:
+    """In-process ranking of users by current streak (ties: lower id first)."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._ranked = RankedSkipList()
+        self._entries = {}  # user id -> (streak, email)
+        self._pages = {}  # (limit, offset) -> JSON bytes for this version
+        self.loaded_at = None
+        self.version = 0
+        # Versions restart in every process and on reset; the epoch keeps
+        # revisions from different workers or lifetimes apart.
+        self.epoch = os.urandom(6).hex()
+
+    @staticmethod
+    def _key(user_id: int, streak: int):
+        return (-(streak or 0), user_id)
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+    @property
+    def revision(self) -> str:
+        """Changes whenever any ranking may have; read it before the data."""
+        return f"{self.epoch}.{self.version}"
+
+    def needs_reload(self) -> bool:
+        if self.loaded_at is None:
+            return True
+        return (
+            LEADERBOARD_RESYNC_SECONDS > 0
+            and time.monotonic() - self.loaded_at > LEADERBOARD_RESYNC_SECONDS
+        )
+
+    def load(self, rows):
+        ranked = RankedSkipList()
+        entries = {}
+        for user_id, email, streak in rows:
+            entries[user_id] = (streak or 0, email)
+            ranked.insert(self._key(user_id, streak))
+
+        with self._lock:
+            self._ranked = ranked
+            self._entries = entries
+            self._pages = {}
+            self.loaded_at = time.monotonic()
+            self.version += 1
+
+    def rebuild(self, db: Session):
+        self.load(db.execute(
+            select(
+                models.User.id,
+                models.User.email,
+                models.User.current_streak
+            )
+        ).all())
+
+    def update(self, user_id: int, email: str, streak: int):
+        with self._lock:
+            if self.loaded_at is None:
+                return  # the next load reads the committed value
+
+            current = self._entries.get(user_id)
+            if current == (streak or 0, email):
+                return
+            if current is not None:
+                self._ranked.remove(self._key(user_id, current[0]))
+
+            self._entries[user_id] = (streak or 0, email)
+            self._ranked.insert(self._key(user_id, streak))
+            self._pages = {}
+            self.version += 1
+
+    def top(self, limit: int, offset: int = 0) -> list[dict]:
+        with self._lock:
+            page = []
+            for position, (negative_streak, user_id) in enumerate(
+                self._ranked.iter_from(offset), start=offset + 1
+            ):
+                if len(page) == limit:
+                    break
+                page.append({
+                    "rank": position,
+                    "user": self._entries[user_id][1],
+                    "streak": -negative_streak
+                })
+            return page
+
+    def top_json(self, limit: int, offset: int = 0) -> bytes:
+        """top() rendered once per version: reads between updates reuse it."""
+        with self._lock:
+            page = self._pages.get((limit, offset))
+            if page is None:
+                if len(self._pages) >= _MAX_CACHED_PAGES:
+                    self._pages.clear()
+                page = orjson.dumps(self.top(limit, offset))
+                self._pages[(limit, offset)] = page
+            return page
+
+    def rank_of(self, user_id: int):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+
+            streak, email = entry
+            return {
+                "rank": self._ranked.rank(self._key(user_id, streak)) + 1,
+                "user": email,
+                "streak": streak,
+                "total_users": len(self._ranked)
+            }
+
+
+leaderboard = LeaderboardIndex()
+
+
+# -----------------------------
+# INCREMENTAL UPDATES ON COMMIT
+# -----------------------------
+@event.listens_for(models.User, "after_insert")
+@event.listens_for(models.User, "after_update")
+def _remember_streak(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("leaderboard_changes", {})[target.id] = (
+            target.email, target.current_streak
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_streaks(session):
+    for user_id, (email, streak) in session.info.pop("leaderboard_changes", {}).items():
+        leaderboard.update(user_id, email, streak)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_streaks(session):
+    session.info.pop("leaderboard_changes", None)
@@ -0,0 +1,194 @@
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, Request
+
+import schemas
+from dependencies import get_current_user_record
+from metrics import Counter
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+# Every caller (a user, or an IP before login) has a bucket of
+# RATE_LIMIT_BURST tokens that refills at RATE_LIMIT_PER_MINUTE; a request
+# takes its route's cost from it and from its group's worker-wide bucket.
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "100"))
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "100"))
+# Defaults for the worker-wide bucket of every group; a group can be given
+# its own with e.g. RATE_LIMIT_GLOBAL_BURST_LOGIN.
+RATE_LIMIT_GLOBAL_BURST = os.getenv("RATE_LIMIT_GLOBAL_BURST", "2000")
+RATE_LIMIT_GLOBAL_PER_MINUTE = os.getenv("RATE_LIMIT_GLOBAL_PER_MINUTE", "2000")
+# Idle buckets kept in memory; full ones are dropped past this.
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Tokens per request, so that with the defaults a user gets 10 AI
+# questions or 3 PDF summaries a minute and an IP 10 logins a minute.
+COSTS = {
+    name: int(os.getenv(f"RATE_LIMIT_COST_{name.upper()}", default))
+    for name, default in {"login": 10, "ai": 10, "pdf": 30}.items()
+}
+
+rejected = Counter(
+    "rate_limit_rejected_total",
+    "Requests answered 429, by route group and the bucket that ran out",
+    labelnames=("group", "bucket"),
+)
+
+
+@dataclass(frozen=True)
+class Limit:
+    capacity: float
+    per_second: float
+
+
+# One worker-wide bucket per group, so a flood of logins can't use up the
+# budget of the AI or PDF routes.
+GLOBAL_LIMITS = {
+    name: Limit(
+        float(os.getenv(f"RATE_LIMIT_GLOBAL_BURST_{name.upper()}", RATE_LIMIT_GLOBAL_BURST)),
+        float(os.getenv(
+            f"RATE_LIMIT_GLOBAL_PER_MINUTE_{name.upper()}", RATE_LIMIT_GLOBAL_PER_MINUTE
+        )) / 60,
+    )
+    for name in COSTS
+}
+
+
+# -----------------------------
+# STORES
+# -----------------------------
+class BucketStore(ABC):
+    """Where bucket levels live. The in-memory store is per worker; a
+    shared store (e.g. Redis running the same arithmetic in a script)
+    makes the limits hold across workers.
+    """
+
+    @abstractmethod
+    def acquire(self, buckets, cost: float, now: float) -> tuple[float, str]:
+        """Take ``cost`` from every (key, Limit) bucket, or from none.
+
+        Returns (0, "") on success, otherwise the seconds until the
+        emptiest bucket could pay and that bucket's key.
+        """
+
+    @abstractmethod
+    def clear(self):
+        """Forget every bucket."""
+
+
+class MemoryBucketStore(BucketStore):
+    def __init__(self, max_keys: int = None):
+        self.max_keys = RATE_LIMIT_MAX_KEYS if max_keys is None else max_keys
+        self._levels = {}  # key -> [tokens, updated_at, Limit]
+        self._lock = threading.Lock()
+
+    def acquire(self, buckets, cost, now):
+        with self._lock:
+            levels = []
+            wait, blocked_by = 0.0, ""
+            for key, limit in buckets:
+                level = self._levels.get(key)
+                if level is None:
+                    tokens = limit.capacity
+                else:
+                    tokens = min(
+                        limit.capacity, level[0] + (now - level[1]) * limit.per_second
+                    )
+                if cost > limit.capacity:
+                    return math.inf, key
+                if tokens < cost:
+                    missing = (cost - tokens) / limit.per_second
+                    if missing > wait:
+                        wait, blocked_by = missing, key
+                levels.append((key, limit, tokens))
+
+            if wait:
+                return wait, blocked_by
+
+            for key, limit, tokens in levels:
+                self._levels[key] = [tokens - cost, now, limit]
+            if len(self._levels) > self.max_keys:
+                self._prune(now)
+            return 0.0, ""
+
+    def _prune(self, now: float):
+        # A bucket that has refilled, at its own rate, is the same as no
+        # bucket at all.
+        full = [
+            key for key, (tokens, at, limit) in self._levels.items()
+            if tokens + (now - at) * limit.per_second >= limit.capacity
+        ]
+        for key in full:
+            del self._levels[key]
+
+    def clear(self):
+        with self._lock:
+            self._levels.clear()
+
+    def __len__(self):
+        return len(self._levels)
+
+
+# -----------------------------
+# LIMITER
+# -----------------------------
+class Limiter:
+    def __init__(self, store: BucketStore = None, enabled: bool = None):
+        self.store = store or MemoryBucketStore()
+        self.enabled = RATE_LIMIT_ENABLED if enabled is None else enabled
+        self.caller = Limit(RATE_LIMIT_BURST, RATE_LIMIT_PER_MINUTE / 60)
+        self.everyone = dict(GLOBAL_LIMITS)  # group -> Limit
+
+    def check(self, group: str, caller: str, cost: float):
+        """Raise 429 with Retry-After unless both buckets can pay."""
+        wait, key = self.store.acquire(
+            ((caller, self.caller), (f"global:{group}", self.everyone[group])),
+            cost,
+            time.monotonic(),
+        )
+        if not wait:
+            return
+
+        bucket = "global" if key.startswith("global:") else "caller"
+        rejected.inc(group, bucket)
+        if math.isinf(wait):
+            raise HTTPException(status_code=429, detail="Request exceeds the rate limit")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+
+limiter = Limiter()
+
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy, run uvicorn with --proxy-headers so this is the client.
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_user(group: str):
+    """Dependency charging COSTS[group] to the authenticated user."""
+    cost = COSTS[group]
+
+    async def dependency(user: schemas.CurrentUser = Depends(get_current_user_record)):
+        if limiter.enabled:
+            limiter.check(group, f"user:{user.id}", cost)
+
+    return dependency
+
+
+def limit_by_ip(group: str):
+    """Dependency charging COSTS[group] to the client address."""
+    cost = COSTS[group]
+
+    async def dependency(request: Request):
+        if limiter.enabled:
+            limiter.check(group, f"ip:{client_ip(request)}", cost)
+
+    return dependency
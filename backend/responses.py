@@ -0,0 +1,58 @@
+import hashlib
+
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson, for routes that return plain dicts.
+
+    Routes with a response_model are better off with FastAPI's default
+    class: it serializes them in pydantic-core, and any custom response
+    class turns that fast path off.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class JSONBytesResponse(Response):
+    """A body that is already JSON; used to skip per-item validation."""
+
+    media_type = "application/json"
+
+
+def rows_to_json(columns, rows) -> bytes:
+    # Column tuples straight to bytes: no ORM objects, no Pydantic models.
+    return orjson.dumps([dict(zip(columns, row)) for row in rows])
+
+
+# -----------------------------
+# CONDITIONAL REQUESTS
+# -----------------------------
+# Polled, per-user data: always revalidate, which is a 304 when unchanged.
+REVALIDATE = "private, no-cache"
+
+
+def etag(*parts) -> str:
+    """Weak ETag over version stamps; weak because compression rewrites bytes."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def is_fresh(request: Request, tag: str) -> bool:
+    """If-None-Match matches ``tag`` (weak comparison, as RFC 9110 asks)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = tag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == bare for candidate in header.split(",")
+    )
+
+
+def not_modified(tag: str, cache_control: str = REVALIDATE) -> Response:
+    return Response(status_code=304, headers={"ETag": tag, "Cache-Control": cache_control})
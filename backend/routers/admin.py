@@ -0,0 +1,51 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+
+import profiling
+
+router = APIRouter(prefix="/admin/profiles", tags=["Admin"])
+
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)):
+    if not profiling.token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+@router.get("/", dependencies=[Depends(require_profiling_token)])
+def list_profiles():
+    # Newest first; stats are fetched one profile at a time.
+    return profiling.profiles.summaries()
+
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profiling_token)])
+def get_profile(
+    profile_id: int,
+    format: Literal["text", "pstats", "collapsed"] = "text",
+    sort: Literal["cumulative", "tottime", "calls"] = "cumulative",
+    limit: int = 40
+):
+    profile = profiling.profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if format == "pstats":
+        return Response(
+            profiling.to_pstats(profile["stats"]),
+            media_type="application/octet-stream",
+            headers={
+                "Content-Disposition": f'attachment; filename="profile-{profile_id}.pstats"'
+            }
+        )
+    if format == "collapsed":
+        return Response(profiling.to_collapsed(profile["stats"]), media_type="text/plain")
+    return Response(
+        profiling.to_text(profile["stats"], limit=limit, sort=sort),
+        media_type="text/plain"
+    )
+
+
+@router.delete("/", dependencies=[Depends(require_profiling_token)])
+def clear_profiles():
+    profiling.profiles.clear()
+    return {"message": "Profiles cleared"}
@@ -1,35 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException
-import google.generativeai as genai
-from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 import os
+import time
+import weakref
+from contextlib import aclosing
 
-from auth import get_current_user
-from schemas import AIQuestion
-
-load_dotenv()
+from ai_cache import answers, cache_key
+from dependencies import get_current_user_record
+from llm import MODEL_NAME, get_model
+from ratelimit import limit_by_user
+from schemas import AIQuestion, CurrentUser
 
 router = APIRouter(prefix="/ai", tags=["AI"])
 
-# Configure Gemini
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+AI_TIMEOUT_SECONDS = float(os.getenv("AI_TIMEOUT_SECONDS", "60"))
+# Upstream generations in flight across all users of this worker.
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+
+_slots = weakref.WeakKeyDictionary()  # event loop -> Semaphore
+
 
-#  Use EXACT model name from list_models()
-model = genai.GenerativeModel("models/gemini-flash-latest")
+def _upstream_slot() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _slots:
+        _slots[loop] = asyncio.Semaphore(AI_MAX_CONCURRENCY)
+    return _slots[loop]
 
 
-@router.post("/ask")
-def ask_ai(
+@router.post("/ask", dependencies=[Depends(limit_by_user("ai"))])
+async def ask_ai(
     payload: AIQuestion,
-    user: str = Depends(get_current_user)
+    user: CurrentUser = Depends(get_current_user_record)
 ):
+    async def generate():
+        async with _upstream_slot():
+            response = await asyncio.wait_for(
+                get_model().generate_content_async(payload.question),
+                AI_TIMEOUT_SECONDS
+            )
+        return response.text
+
     try:
-        response = model.generate_content(payload.question)
+        answer = await answers.get_or_compute(
+            cache_key(payload.question, MODEL_NAME), generate
+        )
 
         return {
             "question": payload.question,
-            "answer": response.text
+            "answer": answer
         }
 
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="AI service timed out")
+
+    except HTTPException:
+        raise
+
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -37,3 +65,74 @@ def ask_ai(
         )
 
 
+# -----------------------------
+# STREAMING (SERVER-SENT EVENTS)
+# -----------------------------
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_answer(request: Request, question: str):
+    deadline = time.monotonic() + AI_TIMEOUT_SECONDS
+
+    async def produce():
+        async with _upstream_slot():
+            response = await asyncio.wait_for(
+                get_model().generate_content_async(question, stream=True),
+                AI_TIMEOUT_SECONDS
+            )
+            chunks = response.__aiter__()
+
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            chunks.__anext__(), deadline - time.monotonic()
+                        )
+                    except StopAsyncIteration:
+                        return
+                    yield chunk.text
+            finally:
+                # Client gone, timed out or failed: stop the upstream call.
+                if hasattr(chunks, "aclose"):
+                    await chunks.aclose()
+
+    # The same cache tiers and coalescing as /ai/ask: an identical question
+    # in flight, streamed or not, is answered once.
+    cached = False
+    try:
+        async with aclosing(
+            answers.stream(cache_key(question, MODEL_NAME), produce)
+        ) as pieces:
+            async for text, cached in pieces:
+                if await request.is_disconnected():
+                    return
+                yield _sse("token", {"text": text})
+
+    except asyncio.TimeoutError:
+        yield _sse("error", {"detail": "AI service timed out"})
+        return
+
+    except Exception as e:
+        yield _sse("error", {"detail": f"AI service error: {str(e)}"})
+        return
+
+    yield _sse("done", {"cached": cached})
+
+
+@router.post("/ask/stream", dependencies=[Depends(limit_by_user("ai"))])
+async def ask_ai_stream(
+    payload: AIQuestion,
+    request: Request,
+    user: CurrentUser = Depends(get_current_user_record)
+):
+    return StreamingResponse(
+        _stream_answer(request, payload.question),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/cache/stats")
+def ai_cache_stats(user: CurrentUser = Depends(get_current_user_record)):
+    return answers.stats()
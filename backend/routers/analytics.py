@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import activity, schemas
+from dependencies import get_db, get_current_user_record
+from responses import ORJSONResponse
+
+router = APIRouter(
+    prefix="/analytics", tags=["Analytics"], default_response_class=ORJSONResponse
+)
+
+# A year of daily buckets: one heat-map's worth.
+DEFAULT_DAYS = 365
+MAX_DAYS = 3 * 366
+
+
+@router.get("/activity")
+async def get_activity(
+    bucket: str = Query("day"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user: schemas.CurrentUser = Depends(get_current_user_record),
+    db: AsyncSession = Depends(get_db)
+):
+    if bucket not in activity.BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"bucket must be one of: {', '.join(activity.BUCKETS)}"
+        )
+
+    end = end or date.today()
+    start = start or end - timedelta(days=DEFAULT_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"range is limited to {MAX_DAYS} days")
+
+    series = await db.run_sync(activity.history, user.id, start, end, bucket)
+    longest = await db.run_sync(activity.longest_streak, user.id)
+
+    return {
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "series": series,
+        "streak": {
+            "current_streak": user.current_streak,
+            # A streak is kept even if its items were deleted since.
+            "longest_streak": max(longest, user.current_streak or 0)
+        }
+    }
@@ -1,32 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 import models, schemas, auth
 from dependencies import get_db
+from ratelimit import limit_by_ip
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-@router.post("/register")
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    hashed = auth.hash_password(user.password)
-    db_user = models.User(email=user.email, hashed_password=hashed)
+@router.post("/register", dependencies=[Depends(limit_by_ip("login"))])
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    hashed = await auth.hash_password_async(user.password)
+    db_user = models.User(
+        email=user.email,
+        hashed_password=hashed,
+        stats=models.UserStats()
+    )
     db.add(db_user)
-    db.commit()
+    await db.commit()
     return {"message": "User registered successfully"}
 
 
-@router.post("/login")
-def login(
+@router.post("/login", dependencies=[Depends(limit_by_ip("login"))])
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # username == email
-    db_user = db.query(models.User).filter(
-        models.User.email == form_data.username
-    ).first()
+    db_user = await db.scalar(
+        select(models.User).where(
+            models.User.email == form_data.username
+        )
+    )
 
-    if not db_user or not auth.verify_password(
+    if not db_user or not await auth.verify_password_async(
         form_data.password,
         db_user.hashed_password
     ):
@@ -40,4 +48,3 @@ def login(
         "access_token": access_token,
         "token_type": "bearer"
     }
-
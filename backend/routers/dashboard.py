@@ -1,33 +1,35 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-import models
-from dependencies import get_db
-from auth import get_current_user
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+import schemas, stats
+from dependencies import get_db, get_current_user_record
+from responses import REVALIDATE, ORJSONResponse, etag, is_fresh, not_modified
 
-router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+router = APIRouter(
+    prefix="/dashboard", tags=["Dashboard"], default_response_class=ORJSONResponse
+)
 
 
 @router.get("/")
-def get_dashboard(
-    user_email: str = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_dashboard(
+    request: Request,
+    user: schemas.CurrentUser = Depends(get_current_user_record),
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(models.User).filter(
-        models.User.email == user_email
-    ).first()
+    # One primary-key read: the counters are kept current by the
+    # study item handlers instead of being counted here.
+    user_stats = await db.run_sync(stats.get_user_stats, user.id)
+
+    # The counters move with the revision, the streak with the user record.
+    tag = etag(
+        "dashboard", user.id, user_stats.revision,
+        user.current_streak, user.last_completed_date
+    )
+    if is_fresh(request, tag):
+        return not_modified(tag)
 
     # -------- TASK PROGRESS --------
-    total_tasks = db.query(models.StudyItem).filter(
-        models.StudyItem.owner_id == user.id,
-        models.StudyItem.type == "task"
-    ).count()
-
-    completed_tasks = db.query(models.StudyItem).filter(
-        models.StudyItem.owner_id == user.id,
-        models.StudyItem.type == "task",
-        models.StudyItem.completed == True
-    ).count()
-
+    total_tasks = user_stats.total_tasks
+    completed_tasks = user_stats.completed_tasks
     pending_tasks = total_tasks - completed_tasks
 
     progress_percentage = (
@@ -36,12 +38,9 @@ def get_dashboard(
     )
 
     # -------- PLANS COUNT (OPTIONAL) --------
-    total_plans = db.query(models.StudyItem).filter(
-        models.StudyItem.owner_id == user.id,
-        models.StudyItem.type == "plan"
-    ).count()
+    total_plans = user_stats.total_plans
 
-    return {
+    return ORJSONResponse({
         "progress": {
             "total_tasks": total_tasks,
             "completed_tasks": completed_tasks,
@@ -55,5 +54,4 @@ def get_dashboard(
         "plans": {
             "total_plans": total_plans
         }
-    }
-
+    }, headers={"ETag": tag, "Cache-Control": REVALIDATE})
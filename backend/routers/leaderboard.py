@@ -1,33 +1,72 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-import models
-from dependencies import get_db
-from auth import get_current_user
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+import schemas
+from dependencies import get_db, get_current_user_record
+from ranking import leaderboard
+from responses import REVALIDATE, JSONBytesResponse, ORJSONResponse, etag, is_fresh, not_modified
+
+router = APIRouter(
+    prefix="/leaderboard", tags=["Leaderboard"], default_response_class=ORJSONResponse
+)
+
+# The same for every user and a few seconds' lag is fine: clients may
+# reuse a page this long before revalidating it.
+LEADERBOARD_MAX_AGE = int(os.getenv("LEADERBOARD_MAX_AGE", "10"))
+TOP_CACHE_CONTROL = f"private, max-age={LEADERBOARD_MAX_AGE}"
+
+
+async def get_leaderboard_index(db: AsyncSession = Depends(get_db)):
+    # Served from memory; the database is only read to (re)build it.
+    if leaderboard.needs_reload():
+        await db.run_sync(leaderboard.rebuild)
+    return leaderboard
 
-router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
 
 @router.get("/")
-def get_leaderboard(
-    user: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    limit: int = 10
+async def get_leaderboard(
+    request: Request,
+    current_user: schemas.CurrentUser = Depends(get_current_user_record),
+    index=Depends(get_leaderboard_index),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0)
 ):
-    users = (
-        db.query(models.User)
-        .order_by(models.User.current_streak.desc())
-        .limit(limit)
-        .all()
+    tag = etag("top", index.revision, limit, offset)
+    if is_fresh(request, tag):
+        return not_modified(tag, TOP_CACHE_CONTROL)
+
+    return JSONBytesResponse(
+        index.top_json(limit, offset),
+        headers={"ETag": tag, "Cache-Control": TOP_CACHE_CONTROL}
     )
 
-    leaderboard = []
-    rank = 1
 
-    for user in users:
-        leaderboard.append({
-            "rank": rank,
-            "user": user.email,
-            "streak": user.current_streak
-        })
-        rank += 1
+@router.get("/me")
+async def get_my_rank(
+    request: Request,
+    current_user: schemas.CurrentUser = Depends(get_current_user_record),
+    index=Depends(get_leaderboard_index)
+):
+    return _rank_or_404(request, index, current_user.id)
 
-    return leaderboard
+
+@router.get("/rank/{user_id}")
+async def get_user_rank(
+    request: Request,
+    user_id: int,
+    current_user: schemas.CurrentUser = Depends(get_current_user_record),
+    index=Depends(get_leaderboard_index)
+):
+    return _rank_or_404(request, index, user_id)
+
+
+def _rank_or_404(request: Request, index, user_id: int):
+    tag = etag("rank", index.revision, user_id)
+    if is_fresh(request, tag):
+        return not_modified(tag)
+
+    rank = index.rank_of(user_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return ORJSONResponse(rank, headers={"ETag": tag, "Cache-Control": REVALIDATE})
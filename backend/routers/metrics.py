@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    # Prometheus scrape target; keep it off the public network.
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
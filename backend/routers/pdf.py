@@ -1,27 +1,21 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-import google.generativeai as genai
-from dotenv import load_dotenv
-import os
-from pypdf import PdfReader
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth import get_current_user
-
-load_dotenv()
+import models
+import pdf_extract
+import pdf_jobs
+from summarizer import Summarizer
+from dependencies import get_current_user_record, get_db
+from llm import MODEL_NAME, get_model
+from ratelimit import limit_by_user
+from schemas import CurrentUser, PdfJobResponse
 
 router = APIRouter(prefix="/pdf", tags=["PDF"])
 
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    raise RuntimeError("GEMINI_API_KEY not set")
-
-genai.configure(api_key=api_key)
-
-model = genai.GenerativeModel("models/gemini-flash-latest")
-
-@router.post("/summarize")
+@router.post("/summarize", dependencies=[Depends(limit_by_user("pdf"))])
 async def summarize_pdf(
     file: UploadFile = File(...),
-    user: str = Depends(get_current_user)
+    user: CurrentUser = Depends(get_current_user_record)
 ):
     try:
         if file.content_type != "application/pdf":
@@ -30,13 +24,8 @@ async def summarize_pdf(
                 detail="Only PDF files are supported"
             )
 
-        reader = PdfReader(file.file)
-        text = ""
-
-        for page in reader.pages:
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted + "\n"
+        data = await pdf_extract.read_upload(file)
+        text = await pdf_extract.extract_text(data)
 
         if not text.strip():
             raise HTTPException(
@@ -44,16 +33,69 @@ async def summarize_pdf(
                 detail="No readable text found in PDF"
             )
 
-        response = model.generate_content(
-            f"Summarize the following study material clearly:\n{text}"
-        )
+        # Large documents are summarized in chunks and merged.
+        summary = await Summarizer(get_model(), MODEL_NAME).summarize(text)
 
         return {
-            "summary": response.text
+            "summary": summary
         }
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"PDF summarization failed: {str(e)}"
         )
+
+
+# -----------------------------
+# BACKGROUND JOBS
+# -----------------------------
+def _job_response(job: models.PdfJob, filename: str) -> PdfJobResponse:
+    response = PdfJobResponse.model_validate(job)
+    update = {"filename": filename}
+    progress = pdf_jobs.queue.progress.get(job.id)
+    if progress is not None:
+        update["chunks_done"], update["chunks_total"] = progress
+    return response.model_copy(update=update)
+
+
+@router.post(
+    "/jobs", status_code=202, response_model=PdfJobResponse,
+    dependencies=[Depends(limit_by_user("pdf"))]
+)
+async def submit_pdf_job(
+    response: Response,
+    file: UploadFile = File(...),
+    user: CurrentUser = Depends(get_current_user_record),
+    db: AsyncSession = Depends(get_db)
+):
+    if file.content_type != "application/pdf":
+        raise HTTPException(
+            status_code=400,
+            detail="Only PDF files are supported"
+        )
+
+    # Spooled to disk so the request returns before any parsing starts.
+    path, digest = await pdf_extract.spool_upload(file, pdf_jobs.PDF_SPOOL_DIR)
+    job = await pdf_jobs.submit(db, path, digest, file.filename, user.id)
+
+    response.headers["Location"] = f"/pdf/jobs/{job.id}"
+    return _job_response(job, file.filename)
+
+
+@router.get("/jobs/{job_id}", response_model=PdfJobResponse)
+async def get_pdf_job(
+    job_id: str,
+    user: CurrentUser = Depends(get_current_user_record),
+    db: AsyncSession = Depends(get_db)
+):
+    # Jobs are shared by everyone who uploads the same file, but only
+    # visible to those uploaders.
+    upload = await db.get(models.PdfJobUpload, (job_id, user.id))
+    job = await db.get(models.PdfJob, job_id) if upload is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job, upload.filename)
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from datetime import date
 from typing import Optional
 
-import models, schemas
-from dependencies import get_db
-from auth import get_current_user
+import activity, models, schemas, search, stats, transfer
+from dependencies import get_db, get_current_user_record
+from responses import REVALIDATE, JSONBytesResponse, etag, is_fresh, not_modified, rows_to_json
 from streaks import update_user_streak
 
 router = APIRouter(prefix="/study-items", tags=["Study Items"])
@@ -15,10 +18,10 @@ router = APIRouter(prefix="/study-items", tags=["Study Items"])
 # CREATE TASK / PLAN
 # -----------------------------
 @router.post("/", response_model=schemas.StudyItemResponse)
-def create_study_item(
+async def create_study_item(
     item: schemas.StudyItemCreate,
-    db: Session = Depends(get_db),
-    user_email: str = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
 ):
     if item.type not in ["task", "plan"]:
         raise HTTPException(
@@ -26,20 +29,17 @@ def create_study_item(
             detail="type must be either 'task' or 'plan'"
         )
 
-    user = db.query(models.User).filter(
-        models.User.email == user_email
-    ).first()
-
     new_item = models.StudyItem(
         title=item.title,
         description=item.description,
         type=item.type,
-        owner=user
+        owner_id=user.id
     )
 
     db.add(new_item)
-    db.commit()
-    db.refresh(new_item)
+    await db.run_sync(stats.apply_delta, user.id, new_item.type, total=1)
+    await db.commit()
+    await db.refresh(new_item)
 
     return new_item
 
@@ -47,17 +47,44 @@ def create_study_item(
 # -----------------------------
 # GET ALL TASKS / PLANS
 # -----------------------------
+ITEM_FIELDS = tuple(schemas.StudyItemResponse.model_fields)
+
+
+def _parse_fields(fields: Optional[str]) -> tuple:
+    if not fields:
+        return ITEM_FIELDS
+
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(ITEM_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    # id is always returned: it is the pagination cursor
+    return tuple(f for f in ITEM_FIELDS if f == "id" or f in requested)
+
+
 @router.get("/", response_model=list[schemas.StudyItemResponse])
-def get_study_items(
+async def get_study_items(
+    request: Request,
     type: Optional[str] = None,
-    db: Session = Depends(get_db),
-    user_email: str = Depends(get_current_user)
+    completed: Optional[bool] = None,
+    completed_after: Optional[date] = None,
+    completed_before: Optional[date] = None,
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
 ):
-    user = db.query(models.User).filter(
-        models.User.email == user_email
-    ).first()
+    selected = _parse_fields(fields)
 
-    query = db.query(models.StudyItem).filter(
+    # Plain column select: rows come back as tuples, no ORM instances.
+    query = select(
+        *(getattr(models.StudyItem, name) for name in selected)
+    ).where(
         models.StudyItem.owner_id == user.id
     )
 
@@ -67,28 +94,405 @@ def get_study_items(
                 status_code=400,
                 detail="type must be either 'task' or 'plan'"
             )
-        query = query.filter(models.StudyItem.type == type)
+        query = query.where(models.StudyItem.type == type)
+
+    if completed is not None:
+        query = query.where(models.StudyItem.completed == completed)
+
+    if completed_after:
+        query = query.where(models.StudyItem.completed_date >= completed_after)
+
+    if completed_before:
+        query = query.where(models.StudyItem.completed_date <= completed_before)
+
+    # Keyset pagination: (owner_id, id) index, cost independent of depth.
+    if cursor is not None:
+        query = query.where(models.StudyItem.id > cursor)
+
+    # Every item write bumps the revision, so an unchanged list is
+    # answered from one user_stats read without touching study_items.
+    headers = {}
+    revision = await db.run_sync(stats.get_revision, user.id)
+    if revision is not None:
+        tag = etag("items", user.id, revision, request.url.query)
+        if is_fresh(request, tag):
+            return not_modified(tag)
+        headers = {"ETag": tag, "Cache-Control": REVALIDATE}
 
-    return query.all()
+    rows = (await db.execute(
+        query.order_by(models.StudyItem.id).limit(limit + 1)
+    )).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = str(rows[-1].id)
+
+    # The columns already match StudyItemResponse (or the projection), so
+    # rows go straight to bytes without a Pydantic model per item.
+    return JSONBytesResponse(rows_to_json(selected, rows), headers=headers)
 
 
 # -----------------------------
-# GET SINGLE TASK / PLAN
+# FULL-TEXT SEARCH
 # -----------------------------
-@router.get("/{item_id}", response_model=schemas.StudyItemResponse)
-def get_study_item_by_id(
-    item_id: int,
-    db: Session = Depends(get_db),
-    user_email: str = Depends(get_current_user)
+# Registered before /{item_id}, which would otherwise capture "search".
+SEARCH_COLUMNS = (*search.RESULT_COLUMNS, "score", "snippet")
+
+
+@router.get("/search", response_model=list[schemas.StudyItemSearchResult])
+async def search_study_items(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[str] = None,
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
+):
+    if type and type not in ["task", "plan"]:
+        raise HTTPException(
+            status_code=400,
+            detail="type must be either 'task' or 'plan'"
+        )
+    if not search.fts5_query(q):
+        raise HTTPException(
+            status_code=400,
+            detail="Search terms must contain letters or digits"
+        )
+
+    # Results are ranked, not id-ordered: the cursor is an offset.
+    offset = cursor or 0
+    rows = (await db.execute(
+        search.search_statement(db.bind.dialect.name, user.id, q, type)
+        .limit(limit + 1)
+        .offset(offset)
+    )).all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = str(offset + limit)
+
+    return JSONBytesResponse(rows_to_json(SEARCH_COLUMNS, rows), headers=headers)
+
+
+# -----------------------------
+# EXPORT / IMPORT
+# -----------------------------
+async def _export_chunks(db: AsyncSession, user_id: int, format: str):
+    item = models.StudyItem
+    columns = [getattr(item, name) for name in transfer.EXPORT_COLUMNS]
+
+    if format == "csv":
+        yield transfer.csv_header()
+
+    # Keyset batches on (owner_id, id): memory stays at one batch, and the
+    # read transaction ends between batches so a slow client holds no
+    # connection (or SQLite WAL snapshot) while it catches up.
+    last_id = 0
+    while True:
+        rows = (await db.execute(
+            select(*columns)
+            .where(item.owner_id == user_id, item.id > last_id)
+            .order_by(item.id)
+            .limit(transfer.EXPORT_BATCH_SIZE)
+        )).all()
+        await db.rollback()
+        if not rows:
+            return
+
+        yield transfer.encode_rows(rows, format)
+        last_id = rows[-1].id
+
+
+@router.get("/export")
+async def export_study_items(
+    format: str = Query("ndjson"),
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
 ):
-    user = db.query(models.User).filter(
-        models.User.email == user_email
-    ).first()
+    format = transfer.check_format(format)
+
+    return StreamingResponse(
+        _export_chunks(db, user.id, format),
+        media_type=transfer.MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="study-items.{format}"'
+        }
+    )
 
-    item = db.query(models.StudyItem).filter(
-        models.StudyItem.id == item_id,
-        models.StudyItem.owner_id == user.id
-    ).first()
+
+@router.post("/import", response_model=schemas.ImportResponse)
+async def import_study_items(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
+):
+    format = transfer.upload_format(format, file.filename)
+
+    # The upload is already spooled; it is parsed a batch at a time in the
+    # threadpool, and each batch is inserted and committed on its own, so
+    # a failure part way keeps the batches before it.
+    records = transfer.parse(file.file, format)
+    imported = failed = 0
+    errors = []
+
+    while batch := await run_in_threadpool(transfer.next_batch, records):
+        rows = []
+        for line, values, error in batch:
+            if error:
+                failed += 1
+                if len(errors) < transfer.IMPORT_MAX_ERRORS:
+                    errors.append(schemas.ImportRowError(line=line, detail=error))
+            else:
+                rows.append({**values, "owner_id": user.id})
+
+        if not rows:
+            continue
+
+        # render_nulls: otherwise the ORM splits the executemany wherever
+        # the rows' None columns differ (completed_date, description).
+        await db.execute(
+            insert(models.StudyItem).execution_options(render_nulls=True), rows
+        )
+
+        totals = {"task": 0, "plan": 0}
+        completed = {"task": 0, "plan": 0}
+        for row in rows:
+            totals[row["type"]] += 1
+            completed[row["type"]] += row["completed"]
+        for item_type in totals:
+            if totals[item_type]:
+                await db.run_sync(
+                    stats.apply_delta, user.id, item_type,
+                    total=totals[item_type], completed=completed[item_type]
+                )
+
+        days = activity.count_days(
+            (row["type"], row["completed"], row["completed_date"]) for row in rows
+        )
+        await db.run_sync(activity.apply_day_counts, user.id, days)
+
+        await db.commit()
+        imported += len(rows)
+
+    return {"imported": imported, "failed": failed, "errors": errors}
+
+
+# -----------------------------
+# BATCH CREATE / COMPLETE / DELETE
+# -----------------------------
+# One transaction and one executemany per batch; registered before the
+# "/{item_id}" routes so "batch" is never parsed as an item id.
+async def _owned_items(db: AsyncSession, user_id: int, ids: list[int]) -> dict:
+    rows = (await db.execute(
+        select(
+            models.StudyItem.id,
+            models.StudyItem.type,
+            models.StudyItem.completed,
+            models.StudyItem.completed_date
+        ).where(
+            models.StudyItem.owner_id == user_id,
+            models.StudyItem.id.in_(ids)
+        )
+    )).all()
+    return {row.id: row for row in rows}
+
+
+def _count_types(rows) -> dict:
+    counts = {"task": 0, "plan": 0}
+    for row in rows:
+        counts[row.type] += 1
+    return counts
+
+
+@router.post("/batch", response_model=schemas.BatchResponse)
+async def create_study_items_batch(
+    batch: schemas.StudyItemBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
+):
+    results = [None] * len(batch.items)
+    rows = []
+    positions = []
+
+    for index, item in enumerate(batch.items):
+        if item.type not in ["task", "plan"]:
+            results[index] = schemas.BatchItemResult(
+                index=index,
+                status="invalid",
+                detail="type must be either 'task' or 'plan'"
+            )
+            continue
+
+        rows.append({
+            "title": item.title,
+            "description": item.description,
+            "type": item.type,
+            "completed": False,
+            "owner_id": user.id,
+        })
+        positions.append(index)
+
+    if rows:
+        new_ids = (await db.execute(
+            insert(models.StudyItem).returning(
+                models.StudyItem.id, sort_by_parameter_order=True
+            ),
+            rows
+        )).scalars().all()
+
+        for index, new_id in zip(positions, new_ids):
+            results[index] = schemas.BatchItemResult(
+                index=index, id=new_id, status="created"
+            )
+
+        for item_type, created in _count_types(
+            batch.items[i] for i in positions
+        ).items():
+            if created:
+                await db.run_sync(stats.apply_delta, user.id, item_type, total=created)
+
+        await db.commit()
+
+    return {"succeeded": len(rows), "results": results}
+
+
+@router.patch("/batch/complete", response_model=schemas.BatchResponse)
+async def complete_study_items_batch(
+    batch: schemas.StudyItemIds,
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
+):
+    ids = list(dict.fromkeys(batch.ids))
+    owned = await _owned_items(db, user.id, ids)
+
+    candidates = []
+    for item_id in ids:
+        row = owned.get(item_id)
+        if row is not None and not row.completed:
+            candidates.append(item_id)
+
+    current_streak = user.current_streak
+    changed = []
+
+    if candidates:
+        # Re-checked in the UPDATE itself: a concurrent complete may have
+        # got there first, and only the rows changed here are counted.
+        changed = (await db.execute(
+            update(models.StudyItem)
+            .where(
+                models.StudyItem.id.in_(candidates),
+                models.StudyItem.owner_id == user.id,
+                models.StudyItem.completed.is_(False)
+            )
+            .values(completed=True, completed_date=date.today())
+            .returning(models.StudyItem.id, models.StudyItem.type)
+            .execution_options(synchronize_session=False)
+        )).all()
+
+    if changed:
+        counts = _count_types(changed)
+
+        # The streak moves at most once per day, so once per batch.
+        if counts["task"]:
+            db_user = await db.get(models.User, user.id)
+            update_user_streak(db_user)
+            current_streak = db_user.current_streak
+
+        for item_type, completed in counts.items():
+            if completed:
+                await db.run_sync(stats.apply_delta, user.id, item_type, completed=completed)
+                await db.run_sync(
+                    activity.apply_completions, user.id, item_type, date.today(), completed
+                )
+
+        await db.commit()
+
+    completed_ids = {row.id for row in changed}
+    results = []
+    for item_id in ids:
+        if item_id not in owned:
+            status = "not_found"
+        elif item_id in completed_ids:
+            status = "completed"
+        else:
+            status = "already_completed"
+        results.append(schemas.BatchItemResult(id=item_id, status=status))
+
+    return {
+        "succeeded": len(completed_ids),
+        "results": results,
+        "current_streak": current_streak
+    }
+
+
+@router.post("/batch/delete", response_model=schemas.BatchResponse)
+async def delete_study_items_batch(
+    batch: schemas.StudyItemIds,
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
+):
+    ids = list(dict.fromkeys(batch.ids))
+
+    # Counted from the rows the DELETE itself removed, so a concurrent
+    # delete or complete of the same items can't be applied twice or stale.
+    rows = (await db.execute(
+        delete(models.StudyItem)
+        .where(
+            models.StudyItem.owner_id == user.id,
+            models.StudyItem.id.in_(ids)
+        )
+        .returning(
+            models.StudyItem.id,
+            models.StudyItem.type,
+            models.StudyItem.completed,
+            models.StudyItem.completed_date
+        )
+        .execution_options(synchronize_session=False)
+    )).all()
+    deleted = {row.id for row in rows}
+
+    results = [
+        schemas.BatchItemResult(
+            id=item_id,
+            status="deleted" if item_id in deleted else "not_found"
+        )
+        for item_id in ids
+    ]
+
+    if rows:
+        totals = _count_types(rows)
+        completed = _count_types(row for row in rows if row.completed)
+        for item_type in totals:
+            if totals[item_type]:
+                await db.run_sync(
+                    stats.apply_delta, user.id, item_type,
+                    total=-totals[item_type],
+                    completed=-completed[item_type]
+                )
+
+        # Completions of deleted items leave the history, as they leave the counters.
+        days = activity.count_days(
+            (row.type, row.completed, row.completed_date) for row in rows
+        )
+        await db.run_sync(activity.apply_day_counts, user.id, days, -1)
+
+        await db.commit()
+
+    return {"succeeded": len(rows), "results": results}
+
+
+# -----------------------------
+# GET SINGLE TASK / PLAN
+# -----------------------------
+async def _get_owned_item(db: AsyncSession, item_id: int, user_id: int) -> models.StudyItem:
+    item = await db.scalar(
+        select(models.StudyItem).where(
+            models.StudyItem.id == item_id,
+            models.StudyItem.owner_id == user_id
+        )
+    )
 
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
@@ -96,27 +500,28 @@ def get_study_item_by_id(
     return item
 
 
+@router.get("/{item_id}", response_model=schemas.StudyItemResponse)
+async def get_study_item_by_id(
+    item_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
+):
+    item = await _get_owned_item(db, item_id, user.id)
+
+    return item
+
+
 # -----------------------------
 # UPDATE TASK / PLAN
 # -----------------------------
 @router.put("/{item_id}", response_model=schemas.StudyItemResponse)
-def update_study_item(
+async def update_study_item(
     item_id: int,
     updated_item: schemas.StudyItemUpdate,
-    db: Session = Depends(get_db),
-    user_email: str = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
 ):
-    user = db.query(models.User).filter(
-        models.User.email == user_email
-    ).first()
-
-    item = db.query(models.StudyItem).filter(
-        models.StudyItem.id == item_id,
-        models.StudyItem.owner_id == user.id
-    ).first()
-
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
+    item = await _get_owned_item(db, item_id, user.id)
 
     if updated_item.title is not None:
         item.title = updated_item.title
@@ -124,8 +529,9 @@ def update_study_item(
     if updated_item.description is not None:
         item.description = updated_item.description
 
-    db.commit()
-    db.refresh(item)
+    await db.run_sync(stats.bump_revision, user.id)
+    await db.commit()
+    await db.refresh(item)
 
     return item
 
@@ -134,38 +540,45 @@ def update_study_item(
 # COMPLETE TASK (STREAK LOGIC)
 # -----------------------------
 @router.patch("/{item_id}/complete")
-def complete_study_item(
+async def complete_study_item(
     item_id: int,
-    db: Session = Depends(get_db),
-    user_email: str = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
 ):
-    user = db.query(models.User).filter(
-        models.User.email == user_email
-    ).first()
-
-    item = db.query(models.StudyItem).filter(
-        models.StudyItem.id == item_id,
-        models.StudyItem.owner_id == user.id
-    ).first()
-
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
+    item = await _get_owned_item(db, item_id, user.id)
 
     if item.completed:
         return {"message": "Item already completed"}
 
-    item.completed = True
-    item.completed_date = date.today()
+    # Conditional, like the batch complete, so a racing complete of the
+    # same item is counted once.
+    completed = await db.execute(
+        update(models.StudyItem)
+        .where(
+            models.StudyItem.id == item.id,
+            models.StudyItem.completed.is_(False)
+        )
+        .values(completed=True, completed_date=date.today())
+        .execution_options(synchronize_session=False)
+    )
+    if not completed.rowcount:
+        return {"message": "Item already completed"}
+
+    current_streak = user.current_streak
 
     # Update streak ONLY for tasks
     if item.type == "task":
-        update_user_streak(user)
+        db_user = await db.get(models.User, user.id)
+        update_user_streak(db_user)
+        current_streak = db_user.current_streak
 
-    db.commit()
+    await db.run_sync(stats.apply_delta, user.id, item.type, completed=1)
+    await db.run_sync(activity.apply_completions, user.id, item.type, date.today())
+    await db.commit()
 
     return {
         "message": "Item completed",
-        "current_streak": user.current_streak
+        "current_streak": current_streak
     }
 
 
@@ -173,24 +586,37 @@ def complete_study_item(
 # DELETE TASK / PLAN
 # -----------------------------
 @router.delete("/{item_id}")
-def delete_study_item(
+async def delete_study_item(
     item_id: int,
-    db: Session = Depends(get_db),
-    user_email: str = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user_record)
 ):
-    user = db.query(models.User).filter(
-        models.User.email == user_email
-    ).first()
-
-    item = db.query(models.StudyItem).filter(
-        models.StudyItem.id == item_id,
-        models.StudyItem.owner_id == user.id
-    ).first()
-
-    if not item:
+    # Conditional, like the batch delete: only the request that removed the
+    # row updates the counters, with the row as it was when removed.
+    item = (await db.execute(
+        delete(models.StudyItem)
+        .where(
+            models.StudyItem.id == item_id,
+            models.StudyItem.owner_id == user.id
+        )
+        .returning(
+            models.StudyItem.type,
+            models.StudyItem.completed,
+            models.StudyItem.completed_date
+        )
+        .execution_options(synchronize_session=False)
+    )).first()
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    db.delete(item)
-    db.commit()
+    await db.run_sync(
+        stats.apply_delta, user.id, item.type,
+        total=-1, completed=-1 if item.completed else 0
+    )
+    if item.completed and item.completed_date:
+        await db.run_sync(
+            activity.apply_completions, user.id, item.type, item.completed_date, -1
+        )
+    await db.commit()
 
     return {"message": "Item deleted successfully"}
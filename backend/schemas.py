@@ -1,5 +1,6 @@
-from pydantic import BaseModel, constr, ConfigDict
+from pydantic import BaseModel, constr, conlist, ConfigDict
 from typing import Optional
+from datetime import date, datetime
 
 class UserCreate(BaseModel):
     email: str
@@ -15,6 +16,27 @@ class StudyItemCreate(BaseModel):
     type: str  # "task" or "plan"
 
 
+class StudyItemBatchCreate(BaseModel):
+    items: conlist(StudyItemCreate, min_length=1, max_length=1000)
+
+
+class StudyItemIds(BaseModel):
+    ids: conlist(int, min_length=1, max_length=1000)
+
+
+class BatchItemResult(BaseModel):
+    id: Optional[int] = None
+    index: Optional[int] = None
+    status: str  # "created", "completed", "deleted", "already_completed", "not_found", "invalid"
+    detail: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    succeeded: int
+    results: list[BatchItemResult]
+    current_streak: Optional[int] = None
+
+
 class StudyItemUpdate(BaseModel):
     title: Optional[str]
     description: Optional[str]
@@ -31,5 +53,53 @@ class StudyItemResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class StudyItemSearchResult(StudyItemResponse):
+    score: float  # higher is better; comparable within one search only
+    snippet: str  # matched text with <mark></mark> around hits, not HTML-escaped
+
+
+class StudyItemImport(BaseModel):
+    title: constr(min_length=1)
+    description: Optional[str] = None
+    type: str  # "task" or "plan"
+    completed: bool = False
+    completed_date: Optional[date] = None
+
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: list[ImportRowError]  # the first IMPORT_MAX_ERRORS only
+
+
 class AIQuestion(BaseModel):
     question: str
+
+
+class CurrentUser(BaseModel):
+    id: int
+    email: str
+    current_streak: Optional[int]
+    last_completed_date: Optional[date]
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class PdfJobResponse(BaseModel):
+    id: str
+    status: str  # "queued", "running", "done", "failed"
+    filename: Optional[str] = None
+    summary: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    # Chunk summaries finished / planned while the job is running
+    chunks_done: Optional[int] = None
+    chunks_total: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
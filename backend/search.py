@@ -0,0 +1,147 @@
+import re
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, literal_column, select, text
+from sqlalchemy.orm import Session
+
+import models
+
+
+HIGHLIGHT_START, HIGHLIGHT_END = "<mark>", "</mark>"
+SNIPPET_TOKENS = 12
+# bm25 column weights: a hit in the title counts ten times a description hit.
+TITLE_WEIGHT, DESCRIPTION_WEIGHT = 10.0, 1.0
+
+RESULT_COLUMNS = ("id", "title", "description", "type", "completed", "completed_date")
+
+
+# -----------------------------
+# SQLITE: FTS5 EXTERNAL-CONTENT TABLE
+# -----------------------------
+# The index stores only tokens; the text stays in study_items. Triggers keep
+# it in step with every write path (single, batch and Core bulk statements).
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS study_items_fts USING fts5("
+    " title, description, content='study_items', content_rowid='id',"
+    " tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS study_items_fts_insert AFTER INSERT ON study_items BEGIN"
+    " INSERT INTO study_items_fts(rowid, title, description)"
+    " VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS study_items_fts_delete AFTER DELETE ON study_items BEGIN"
+    " INSERT INTO study_items_fts(study_items_fts, rowid, title, description)"
+    " VALUES ('delete', old.id, old.title, old.description); END",
+    # Only text changes touch the index; completing an item does not.
+    "CREATE TRIGGER IF NOT EXISTS study_items_fts_update"
+    " AFTER UPDATE OF title, description ON study_items BEGIN"
+    " INSERT INTO study_items_fts(study_items_fts, rowid, title, description)"
+    " VALUES ('delete', old.id, old.title, old.description);"
+    " INSERT INTO study_items_fts(rowid, title, description)"
+    " VALUES (new.id, new.title, new.description); END",
+)
+
+# Not on Base.metadata: create_all must not try to create a plain table.
+fts_table = Table(
+    "study_items_fts",
+    MetaData(),
+    Column("rowid", Integer),
+    Column("title", String),
+    Column("description", String),
+)
+_fts = literal_column("study_items_fts")
+
+
+def create_sqlite_index(conn) -> bool:
+    """Create the FTS table and triggers; backfill if the table is new."""
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = 'study_items_fts'"
+    ).first()
+    for statement in SQLITE_DDL:
+        conn.exec_driver_sql(statement)
+    if not exists:
+        conn.exec_driver_sql("INSERT INTO study_items_fts(study_items_fts) VALUES ('rebuild')")
+    return not exists
+
+
+def fts5_query(terms: str) -> str:
+    """User input as an FTS5 query: every word must match, the last as a prefix.
+
+    Words are quoted, so operators, column filters and stray quotes in the
+    input are searched for rather than parsed.
+    """
+    words = re.findall(r"\w+", terms)
+    if not words:
+        return ""
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+# -----------------------------
+# POSTGRES: TSVECTOR EXPRESSION + GIN INDEX
+# -----------------------------
+# Must match ix_study_items_search in models.py for the index to be used.
+def _pg_document():
+    return func.to_tsvector(
+        "english",
+        func.coalesce(models.StudyItem.title, "")
+        + " "
+        + func.coalesce(models.StudyItem.description, ""),
+    )
+
+
+# -----------------------------
+# QUERY
+# -----------------------------
+def search_statement(dialect: str, owner_id: int, terms: str, item_type: str = None):
+    """Select of RESULT_COLUMNS plus score and snippet, best match first."""
+    item = models.StudyItem
+    columns = [getattr(item, name) for name in RESULT_COLUMNS]
+
+    if dialect == "postgresql":
+        query = func.websearch_to_tsquery("english", terms)
+        document = _pg_document()
+        statement = select(
+            *columns,
+            func.ts_rank_cd(document, query).label("score"),
+            func.ts_headline(
+                "english",
+                func.coalesce(item.title, "") + " " + func.coalesce(item.description, ""),
+                query,
+                f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, "
+                f"MaxWords={SNIPPET_TOKENS * 2}, MinWords={SNIPPET_TOKENS // 2}",
+            ).label("snippet"),
+        ).where(
+            document.op("@@")(query)
+        )
+    else:
+        score = func.bm25(_fts, TITLE_WEIGHT, DESCRIPTION_WEIGHT)
+        statement = select(
+            *columns,
+            # bm25 is lower-is-better; flip it so both backends sort descending.
+            (-score).label("score"),
+            func.snippet(
+                _fts, -1, HIGHLIGHT_START, HIGHLIGHT_END, "…", SNIPPET_TOKENS
+            ).label("snippet"),
+        ).select_from(
+            fts_table.join(item, item.id == fts_table.c.rowid)
+        ).where(
+            _fts.op("MATCH")(fts5_query(terms))
+        )
+
+    statement = statement.where(
+        item.owner_id == owner_id
+    ).order_by(literal_column("score").desc(), item.id)
+    if item_type:
+        statement = statement.where(item.type == item_type)
+    return statement
+
+
+def rebuild(db: Session) -> int:
+    """Re-derive the search index from study_items; returns the item count."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        create_sqlite_index(db.connection())
+        db.execute(text("INSERT INTO study_items_fts(study_items_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        db.execute(text("REINDEX INDEX ix_study_items_search"))
+    db.commit()
+    return db.scalar(select(func.count()).select_from(models.StudyItem))
@@ -0,0 +1,116 @@
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+import models
+
+
+COUNTERS = ("total_tasks", "completed_tasks", "total_plans", "completed_plans")
+
+
+def _item_counts():
+    item = models.StudyItem
+    is_task = item.type == "task"
+    is_plan = item.type == "plan"
+    is_done = item.completed == True
+
+    return select(
+        item.owner_id,
+        func.sum(case((is_task, 1), else_=0)).label("total_tasks"),
+        func.sum(case((is_task & is_done, 1), else_=0)).label("completed_tasks"),
+        func.sum(case((is_plan, 1), else_=0)).label("total_plans"),
+        func.sum(case((is_plan & is_done, 1), else_=0)).label("completed_plans"),
+    ).group_by(item.owner_id)
+
+
+def rebuild_user_stats(db: Session, user_id: int) -> models.UserStats:
+    # Counts whatever is already flushed, so callers must not apply
+    # their own delta on top of a freshly rebuilt row.
+    row = db.execute(
+        _item_counts().where(models.StudyItem.owner_id == user_id)
+    ).first()
+
+    stats = db.get(models.UserStats, user_id)
+    if stats is None:
+        stats = models.UserStats(user_id=user_id)
+        db.add(stats)
+
+    for name in COUNTERS:
+        setattr(stats, name, getattr(row, name) if row else 0)
+
+    db.flush()
+    return stats
+
+
+def apply_delta(db: Session, user_id: int, item_type: str, total: int = 0, completed: int = 0):
+    """Adjust a user's counters inside the caller's transaction."""
+    db.flush()
+
+    prefix = "tasks" if item_type == "task" else "plans"
+    stats = models.UserStats
+    total_col = getattr(stats, f"total_{prefix}")
+    completed_col = getattr(stats, f"completed_{prefix}")
+
+    result = db.execute(
+        update(stats)
+        .where(stats.user_id == user_id)
+        .values({
+            total_col: total_col + total,
+            completed_col: completed_col + completed,
+            stats.revision: stats.revision + 1,
+        })
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount == 0:
+        rebuild_user_stats(db, user_id)
+
+
+def bump_revision(db: Session, user_id: int):
+    """For item writes that leave the counters alone (e.g. a rename)."""
+    db.flush()
+    stats = models.UserStats
+    result = db.execute(
+        update(stats)
+        .where(stats.user_id == user_id)
+        .values(revision=stats.revision + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        rebuild_user_stats(db, user_id)
+
+
+def get_revision(db: Session, user_id: int):
+    """The user's revision, or None before their stats row exists."""
+    return db.scalar(
+        select(models.UserStats.revision).where(models.UserStats.user_id == user_id)
+    )
+
+
+def get_user_stats(db: Session, user_id: int) -> models.UserStats:
+    stats = db.get(models.UserStats, user_id)
+    if stats is None:
+        stats = rebuild_user_stats(db, user_id)
+        db.commit()
+    return stats
+
+
+def rebuild_all(db: Session) -> int:
+    """Recompute every user's counters in a few set-based statements."""
+    counts = _item_counts().subquery()
+    users = models.User
+
+    # Past every revision handed out so far, so no old ETag can match.
+    revision = (db.scalar(select(func.max(models.UserStats.revision))) or 0) + 1
+
+    rows = select(
+        users.id,
+        *(func.coalesce(getattr(counts.c, name), 0) for name in COUNTERS),
+        literal(revision),
+    ).outerjoin(counts, counts.c.owner_id == users.id)
+
+    db.execute(delete(models.UserStats))
+    result = db.execute(
+        insert(models.UserStats).from_select(("user_id", *COUNTERS, "revision"), rows)
+    )
+    db.commit()
+    return result.rowcount
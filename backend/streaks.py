@@ -1,5 +1,9 @@
 from datetime import date, timedelta
+from sqlalchemy import update
+from sqlalchemy.orm import Session
 import models
+import ranking
+import user_cache
 
 def update_user_streak(user: models.User):
     today = date.today()
@@ -21,3 +25,27 @@ def update_user_streak(user: models.User):
         user.current_streak = 1
 
     user.last_completed_date = today
+
+
+def expire_stale_streaks(db: Session, today: date = None) -> int:
+    """Reset every streak whose last completion is before yesterday."""
+    today = today or date.today()
+
+    expired = db.execute(
+        update(models.User)
+        .where(
+            models.User.current_streak > 0,
+            models.User.last_completed_date < today - timedelta(days=1)
+        )
+        .values(current_streak=0)
+        .returning(models.User.id, models.User.email)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+
+    # A Core UPDATE bypasses the ORM events that normally keep these in sync.
+    for user_id, email in expired:
+        user_cache.invalidate_user(user_id)
+        ranking.leaderboard.update(user_id, email, 0)
+
+    return len(expired)
@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import os
+import re
+
+from cache import TTLCache
+
+
+# Rough budget per prompt; ~4 characters per token for English prose.
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "6000"))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+CHARS_PER_TOKEN = 4
+MAX_REDUCE_ROUNDS = 5
+
+SINGLE_PROMPT = "Summarize the following study material clearly:\n{text}"
+MAP_PROMPT = (
+    "Summarize this section of a longer study document clearly, "
+    "keeping the key facts, terms and formulas:\n{text}"
+)
+REDUCE_PROMPT = (
+    "Combine these partial summaries of one study document into a single "
+    "clear summary without repeating points:\n{text}"
+)
+
+# sha256(model + prompt) -> summary, shared by every upload
+chunk_cache = TTLCache(
+    maxsize=int(os.getenv("SUMMARY_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("SUMMARY_CACHE_TTL", "86400")),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _hard_split(text: str, max_chars: int) -> list[str]:
+    return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+
+def split_into_chunks(text: str, max_tokens: int) -> list[str]:
+    """Pack paragraphs (then sentences, then raw slices) into budgeted chunks."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n|\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            pieces.extend(_hard_split(sentence, max_chars))
+
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        if current and size + len(piece) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class Summarizer:
+    """Map-reduce summaries: chunks in parallel, then hierarchical merges."""
+
+    def __init__(
+        self,
+        model,
+        model_name: str = "",
+        max_tokens: int = None,
+        concurrency: int = None,
+        on_progress=None,
+    ):
+        self.model = model
+        self.model_name = model_name
+        self.max_tokens = max_tokens or SUMMARY_CHUNK_TOKENS
+        self.concurrency = concurrency or SUMMARY_CONCURRENCY
+        # on_progress(done, total): total grows as reduce rounds are added
+        self.on_progress = on_progress
+        self.done = 0
+        self.total = 0
+
+    def _advance(self, done: int = 0, total: int = 0):
+        self.done += done
+        self.total += total
+        if self.on_progress:
+            self.on_progress(self.done, self.total)
+
+    async def _generate(self, semaphore, prompt: str) -> str:
+        key = hashlib.sha256(f"{self.model_name}\0{prompt}".encode()).hexdigest()
+        summary = chunk_cache.get(key)
+        if summary is None:
+            async with semaphore:
+                response = await self.model.generate_content_async(prompt)
+            summary = response.text
+            chunk_cache.set(key, summary)
+        self._advance(done=1)
+        return summary
+
+    async def _round(self, semaphore, template: str, chunks: list[str]) -> list[str]:
+        prompts = [template.format(text=chunk) for chunk in chunks]
+        # Repeated sections (headers, boilerplate) are sent once.
+        unique = list(dict.fromkeys(prompts))
+        self._advance(total=len(unique))
+        summaries = dict(zip(unique, await asyncio.gather(*(
+            self._generate(semaphore, prompt) for prompt in unique
+        ))))
+        return [summaries[prompt] for prompt in prompts]
+
+    async def summarize(self, text: str) -> str:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        chunks = split_into_chunks(text, self.max_tokens)
+        if len(chunks) <= 1:
+            return (await self._round(semaphore, SINGLE_PROMPT, [text]))[0]
+
+        partials = await self._round(semaphore, MAP_PROMPT, chunks)
+
+        for _ in range(MAX_REDUCE_ROUNDS):
+            combined = "\n\n".join(partials)
+            if estimate_tokens(combined) <= self.max_tokens:
+                break
+            groups = split_into_chunks(combined, self.max_tokens)
+            if len(groups) >= len(partials):
+                # Summaries aren't shrinking; merge pairwise to converge.
+                groups = [
+                    "\n\n".join(partials[i:i + 2])
+                    for i in range(0, len(partials), 2)
+                ]
+            partials = await self._round(semaphore, REDUCE_PROMPT, groups)
+
+        return (await self._round(semaphore, REDUCE_PROMPT, ["\n\n".join(partials)]))[0]
@@ -1,3 +1,4 @@
+import os
 import pytest
 import uuid
 from httpx import AsyncClient, ASGITransport
@@ -5,9 +6,16 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+# Answer AI questions offline; no Gemini key or network needed.
+os.environ.setdefault("AI_MODEL", "fake")
+# Tests log in far more often than any client should; test_ratelimit turns it on.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
 from main import app
-from database import Base
+from database import Base, SyncSession
 from dependencies import get_db
+from migrations import init_db
+from tests.pdfs import make_pdf  # used by the PDF tests as tests.conftest.make_pdf
 
 # IMPORTANT: import models so tables are registered
 import models
@@ -31,23 +39,24 @@ TestingSessionLocal = sessionmaker(
 )
 
 # =====================================================
-# 2. Override DB dependency
+# 2. Override DB dependency (sync engine behind the async API)
 # =====================================================
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
+async def override_get_db():
+    async with SyncSession(TestingSessionLocal()) as db:
         yield db
-    finally:
-        db.close()
 
 app.dependency_overrides[get_db] = override_get_db
 
+# Background PDF jobs open their own sessions outside any request.
+import pdf_jobs
+pdf_jobs.queue.session_factory = lambda: SyncSession(TestingSessionLocal())
+
 # =====================================================
 # 3. Create tables ONCE per test session
 # =====================================================
 @pytest.fixture(scope="session", autouse=True)
 def create_test_tables():
-    Base.metadata.create_all(bind=engine)
+    init_db(engine)
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -67,8 +76,7 @@ async def client():
 # =====================================================
 # 5. Auth headers fixture
 # =====================================================
-@pytest.fixture
-async def auth_headers(client):
+async def register_and_login(client):
     email = f"user_{uuid.uuid4()}@test.com"
     password = "password123"
 
@@ -99,3 +107,13 @@ async def auth_headers(client):
         "Authorization": f"Bearer {token}"
     }
 
+
+@pytest.fixture
+async def auth_headers(client):
+    return await register_and_login(client)
+
+
+@pytest.fixture
+async def other_auth_headers(client):
+    # A second, unrelated user.
+    return await register_and_login(client)
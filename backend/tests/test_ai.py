@@ -25,3 +25,209 @@ async def test_ai_assistant_empty_question(client, auth_headers):
     assert response.status_code in (422, 500)
 
 
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        import asyncio
+        from types import SimpleNamespace
+
+        self.calls += 1
+        await asyncio.sleep(0.05)  # long enough for duplicates to overlap
+        return SimpleNamespace(text=f"answer to {prompt}")
+
+
+@pytest.fixture
+def counting_model(monkeypatch):
+    import llm
+    from ai_cache import answers
+
+    model = CountingModel()
+    monkeypatch.setattr(llm, "_model", model)
+    answers.clear()
+    yield model
+    answers.clear()
+
+
+@pytest.mark.asyncio
+async def test_ai_duplicate_questions_share_one_call(client, auth_headers, counting_model):
+    import asyncio
+
+    responses = await asyncio.gather(*(
+        client.post("/ai/ask", json={"question": "What is a heap?"}, headers=auth_headers)
+        for _ in range(5)
+    ))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert counting_model.calls == 1
+
+    # Normalized: case and whitespace don't matter.
+    again = await client.post(
+        "/ai/ask", json={"question": "  what is a   HEAP? "}, headers=auth_headers
+    )
+    assert again.json()["answer"] == "answer to What is a heap?"
+    assert counting_model.calls == 1
+
+    stats = (await client.get("/ai/cache/stats", headers=auth_headers)).json()
+    assert stats["hits"] >= 1
+    assert stats["coalesced"] >= 1
+
+
+def test_sqlite_store_round_trip_and_eviction(tmp_path):
+    from ai_cache import SQLiteCacheStore
+
+    store = SQLiteCacheStore(str(tmp_path / "ai.db"), ttl=60, max_entries=10)
+    for i in range(100):
+        store.set(f"k{i}", f"v{i}")
+
+    assert store.get("k99") == "v99"
+    assert store.get("k0") is None
+
+
+@pytest.mark.asyncio
+async def test_follower_answered_when_leader_cancelled():
+    import asyncio
+    from ai_cache import AIResponseCache
+    from cache import TTLCache
+
+    cache = AIResponseCache(TTLCache(maxsize=10, ttl=60))
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.Event().wait()
+
+    async def answer():
+        return "answer"
+
+    leader = asyncio.create_task(cache.get_or_compute("k", hang))
+    await started.wait()
+    follower = asyncio.create_task(cache.get_or_compute("k", answer))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+
+    assert await follower == "answer"
+    assert leader.cancelled()
+    assert cache.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_ai_stream_sends_tokens_then_done(client, auth_headers):
+    from ai_cache import answers
+
+    answers.clear()
+    response = await client.post(
+        "/ai/ask/stream",
+        json={"question": "Explain recursion"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [block.split("\n")[0] for block in response.text.strip().split("\n\n")]
+    assert events.count("event: token") > 1
+    assert events[-1] == "event: done"
+
+
+@pytest.mark.asyncio
+async def test_ai_streams_share_the_answer_cache(client, auth_headers, monkeypatch, tmp_path):
+    import asyncio
+    import json
+    import llm
+    from ai_cache import AIResponseCache, SQLiteCacheStore, cache_key
+    from cache import TTLCache
+    from routers import ai
+
+    model = llm.FakeModel(delay=0.02)
+    monkeypatch.setattr(llm, "_model", model)
+    store = SQLiteCacheStore(str(tmp_path / "ai.db"), ttl=60, max_entries=10)
+    monkeypatch.setattr(ai, "answers", AIResponseCache(TTLCache(maxsize=10, ttl=60), store))
+    ask = {"question": "What is a trie?"}
+
+    responses = await asyncio.gather(*(
+        client.post("/ai/ask/stream", json=ask, headers=auth_headers) for _ in range(3)
+    ))
+
+    def parse(response):
+        events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+        text = "".join(json.loads(data[6:])["text"] for event, data in events[:-1])
+        return text, json.loads(events[-1][1][6:])["cached"]
+
+    streamed = [parse(response) for response in responses]
+    assert model.calls == 1
+    assert sorted(cached for _, cached in streamed) == [False, True, True]
+    assert len({text for text, _ in streamed}) == 1
+
+    # The persistent tier is filled too, and /ai/ask reads what a stream cached.
+    answer = streamed[0][0]
+    assert store.get(cache_key(ask["question"], llm.MODEL_NAME)) == answer
+    plain = await client.post("/ai/ask", json=ask, headers=auth_headers)
+    assert plain.json()["answer"] == answer
+    assert model.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_follower_answered_when_stream_leader_leaves():
+    import asyncio
+    from contextlib import aclosing
+    from ai_cache import AIResponseCache
+    from cache import TTLCache
+
+    cache = AIResponseCache(TTLCache(maxsize=10, ttl=60))
+
+    async def slow():
+        yield "partial "
+        await asyncio.Event().wait()
+
+    async def answer():
+        return "answer"
+
+    async with aclosing(cache.stream("k", slow)) as pieces:
+        async for piece in pieces:
+            follower = asyncio.create_task(cache.get_or_compute("k", answer))
+            await asyncio.sleep(0)
+            break  # the streaming client went away
+
+    assert await follower == "answer"
+    assert cache.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_ai_stream_times_out(client, auth_headers, monkeypatch):
+    import llm
+    from routers import ai
+
+    monkeypatch.setattr(llm, "_model", llm.FakeModel(delay=0.2))
+    monkeypatch.setattr(ai, "AI_TIMEOUT_SECONDS", 0.1)
+
+    response = await client.post(
+        "/ai/ask/stream",
+        json={"question": "Explain a very slow topic"},
+        headers=auth_headers,
+    )
+
+    assert "event: error" in response.text
+    assert "timed out" in response.text
+
+
+@pytest.mark.asyncio
+async def test_ai_without_key_is_unavailable(client, auth_headers, monkeypatch):
+    import llm
+
+    monkeypatch.setattr(llm, "AI_MODEL", "gemini")
+    monkeypatch.setattr(llm, "_model", None)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+
+    response = await client.post(
+        "/ai/ask",
+        json={"question": "Is the model configured?"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 503
+    assert llm._model is None
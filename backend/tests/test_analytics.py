@@ -0,0 +1,165 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, select, text
+
+import activity
+import models
+from migrations import init_db
+from tests.conftest import TestingSessionLocal
+
+TODAY = date.today()
+
+
+async def create(client, headers, title="Item", type="task"):
+    response = await client.post(
+        "/study-items/", json={"title": title, "type": type}, headers=headers
+    )
+    return response.json()["id"]
+
+
+def owner_of(item_id: int) -> int:
+    with TestingSessionLocal() as db:
+        return db.get(models.StudyItem, item_id).owner_id
+
+
+def rollup(user_id: int) -> dict:
+    with TestingSessionLocal() as db:
+        rows = db.execute(
+            select(models.DailyActivity).where(models.DailyActivity.user_id == user_id)
+        ).scalars()
+        return {
+            row.day: (row.completed_tasks, row.completed_plans)
+            for row in rows if row.completed_tasks or row.completed_plans
+        }
+
+
+@pytest.mark.asyncio
+async def test_completions_are_rolled_up_per_day(client, auth_headers):
+    task = await create(client, auth_headers)
+    plan = await create(client, auth_headers, type="plan")
+    batch = (await client.post(
+        "/study-items/batch",
+        json={"items": [{"title": "A", "type": "task"}, {"title": "B", "type": "task"}]},
+        headers=auth_headers,
+    )).json()
+    batch_ids = [result["id"] for result in batch["results"]]
+
+    await client.patch(f"/study-items/{task}/complete", headers=auth_headers)
+    await client.patch(f"/study-items/{task}/complete", headers=auth_headers)  # no-op
+    await client.patch(f"/study-items/{plan}/complete", headers=auth_headers)
+    await client.patch(
+        "/study-items/batch/complete", json={"ids": batch_ids}, headers=auth_headers
+    )
+
+    response = await client.get("/analytics/activity", headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["bucket"] == "day"
+    assert data["end"] == TODAY.isoformat()
+    assert data["series"] == [{
+        "date": TODAY.isoformat(), "completed_tasks": 3, "completed_plans": 1, "total": 4,
+    }]
+    assert data["streak"] == {"current_streak": 1, "longest_streak": 1}
+
+    await client.delete(f"/study-items/{task}", headers=auth_headers)
+    await client.post("/study-items/batch/delete", json={"ids": batch_ids[:1]}, headers=auth_headers)
+
+    [today] = (await client.get("/analytics/activity", headers=auth_headers)).json()["series"]
+    assert (today["completed_tasks"], today["completed_plans"]) == (1, 1)
+
+    # The incremental rollup agrees with one rebuilt from the items.
+    user_id = owner_of(plan)
+    before = rollup(user_id)
+    with TestingSessionLocal() as db:
+        activity.rebuild_all(db)
+    assert rollup(user_id) == before
+
+
+@pytest.mark.asyncio
+async def test_history_buckets_and_longest_streak(client, auth_headers):
+    # 2024-01-01 is a Monday.
+    history = {
+        date(2024, 1, 1): ["task", "task"],
+        date(2024, 1, 2): ["task"],
+        date(2024, 1, 3): ["plan"],        # plans do not extend a streak
+        date(2024, 1, 8): ["task"],
+        date(2024, 1, 9): ["task"],
+        date(2024, 1, 10): ["task"],
+        date(2024, 2, 29): ["plan"],
+    }
+    user_id = owner_of(await create(client, auth_headers))
+    with TestingSessionLocal() as db:
+        for day, types in history.items():
+            for type in types:
+                db.add(models.StudyItem(
+                    title="Old", type=type, owner_id=user_id,
+                    completed=True, completed_date=day,
+                ))
+        db.commit()
+        activity.rebuild_all(db)
+
+    async def series(bucket):
+        response = await client.get(
+            "/analytics/activity",
+            params={"bucket": bucket, "start": "2024-01-01", "end": "2024-12-31"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    days = await series("day")
+    assert [(row["date"], row["total"]) for row in days["series"]] == [
+        ("2024-01-01", 2), ("2024-01-02", 1), ("2024-01-03", 1), ("2024-01-08", 1),
+        ("2024-01-09", 1), ("2024-01-10", 1), ("2024-02-29", 1),
+    ]
+    assert days["streak"]["longest_streak"] == 3
+
+    weeks = await series("week")
+    assert [(row["date"], row["completed_tasks"], row["completed_plans"])
+            for row in weeks["series"]] == [
+        ("2024-01-01", 3, 1), ("2024-01-08", 3, 0), ("2024-02-26", 0, 1),
+    ]
+
+    months = await series("month")
+    assert [(row["date"], row["total"]) for row in months["series"]] == [
+        ("2024-01-01", 7), ("2024-02-01", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_activity_rejects_bad_parameters(client, auth_headers):
+    for params in (
+        {"bucket": "year"},
+        {"start": "2024-02-01", "end": "2024-01-01"},
+        {"start": "2000-01-01", "end": "2024-01-01"},
+    ):
+        response = await client.get("/analytics/activity", params=params, headers=auth_headers)
+        assert response.status_code == 400, params
+
+    assert (await client.get("/analytics/activity")).status_code == 401
+
+
+def test_init_db_backfills_activity(tmp_path):
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE study_items (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+            "description VARCHAR, type VARCHAR, completed BOOLEAN, "
+            "completed_date DATE, owner_id INTEGER)"
+        ))
+        conn.execute(text(
+            "INSERT INTO study_items (title, type, completed, completed_date, owner_id) VALUES "
+            "('a', 'task', 1, '2024-03-01', 1), ('b', 'plan', 1, '2024-03-01', 1), "
+            "('c', 'task', 0, NULL, 1)"
+        ))
+
+    init_db(legacy)
+    init_db(legacy)
+
+    with legacy.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT user_id, day, completed_tasks, completed_plans FROM daily_activity"
+        )).all()
+    assert rows == [(1, "2024-03-01", 1, 1)]
@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import create_engine
+
+from main import app
+from dependencies import get_db
+from migrations import init_db
+import ranking
+import user_cache
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def async_db(tmp_path, monkeypatch):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    path = tmp_path / "async.db"
+    init_db(create_engine(f"sqlite:///{path}"))
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    # Ids restart at 1 in the new database; drop in-process state that
+    # was built from the shared test database.
+    user_cache.invalidate_all()
+    ranking.leaderboard.reset()
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    yield
+    user_cache.invalidate_all()
+    ranking.leaderboard.reset()
+
+
+@pytest.mark.asyncio
+async def test_crud_path_on_async_engine(client, async_db):
+    await client.post(
+        "/auth/register",
+        json={"email": "async@test.com", "password": "password123"},
+    )
+    login = await client.post(
+        "/auth/login",
+        data={"username": "async@test.com", "password": "password123"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    created = await client.post(
+        "/study-items/",
+        json={"title": "Async task", "type": "task"},
+        headers=headers,
+    )
+    assert created.status_code == 200
+
+    item_id = created.json()["id"]
+    updated = await client.put(
+        f"/study-items/{item_id}",
+        json={"title": "Async task v2", "description": None, "completed": None},
+        headers=headers,
+    )
+    assert updated.json()["title"] == "Async task v2"
+
+    completed = await client.patch(f"/study-items/{item_id}/complete", headers=headers)
+    assert completed.json()["current_streak"] == 1
+
+    dashboard = (await client.get("/dashboard/", headers=headers)).json()
+    assert dashboard["progress"]["completed_tasks"] == 1
+    assert dashboard["streak"]["current_streak"] == 1
+
+    leaderboard = (await client.get("/leaderboard/", headers=headers)).json()
+    assert leaderboard[0]["user"] == "async@test.com"
+
+    deleted = await client.delete(f"/study-items/{item_id}", headers=headers)
+    assert deleted.status_code == 200
@@ -52,3 +52,59 @@ async def test_login_invalid_password(client):
     )
 
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_login_rejected_when_hash_queue_full(client, monkeypatch):
+    import auth
+
+    # Unknown users never reach bcrypt, so register one first.
+    await client.post(
+        "/auth/register",
+        json={"email": "busy@test.com", "password": "password123"},
+    )
+    monkeypatch.setattr(auth, "_hash_pending", auth.HASH_WORKERS + auth.HASH_MAX_PENDING)
+
+    response = await client.post(
+        "/auth/login",
+        data={"username": "busy@test.com", "password": "password123"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_hash_latency_is_recorded(client):
+    import auth
+
+    before = auth.hash_latency.count("hash")
+
+    await client.post(
+        "/auth/register",
+        json={"email": "timed@test.com", "password": "password123"},
+    )
+
+    assert auth.hash_latency.count("hash") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_cached_user_skips_users_query(client, auth_headers):
+    from sqlalchemy import event
+    from tests.conftest import engine
+
+    await client.get("/leaderboard/", headers=auth_headers)
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = await client.get("/study-items/", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert not any("FROM users" in s for s in statements)
@@ -0,0 +1,38 @@
+from benchmarks.load import compare, percentile, summarize
+
+
+def test_percentiles_are_nearest_rank():
+    values = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+
+    summary = summarize(values, errors=2, seconds=10)
+
+    assert summary == {
+        "requests": 100,
+        "errors": 2,
+        "rps": 10.0,
+        "p50_ms": 50.0,
+        "p95_ms": 95.0,
+        "p99_ms": 99.0,
+    }
+    assert percentile([], 0.95) == 0.0
+    assert percentile([0.2], 0.99) == 0.2
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    def row(p95, rps, requests=100):
+        return {"requests": requests, "p95_ms": p95, "rps": rps}
+
+    baseline = {"scenarios": {
+        "list": row(10, 100), "dashboard": row(10, 100), "pdf": row(10, 100),
+    }}
+    results = {"scenarios": {
+        "list": row(12, 95),                  # within 25%
+        "dashboard": row(20, 50),             # slower and fewer req/s
+        "pdf": row(50, 1, requests=3),        # too few samples to judge
+        "new": row(10, 100),                  # not in the baseline
+    }}
+
+    regressions = compare(results, baseline, tolerance=0.25)
+
+    assert len(regressions) == 2
+    assert all(line.startswith("dashboard:") for line in regressions)
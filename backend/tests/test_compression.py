@@ -0,0 +1,64 @@
+import pytest
+
+from compression import brotli, choose_encoding
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("br, gzip") == ("br" if brotli else "gzip")
+
+
+@pytest.mark.asyncio
+async def test_large_list_is_gzipped(client, auth_headers):
+    await client.post(
+        "/study-items/batch",
+        json={"items": [
+            {"title": f"Compressible chapter {n}", "type": "task"} for n in range(100)
+        ]},
+        headers=auth_headers,
+    )
+
+    plain = await client.get(
+        "/study-items/", headers={**auth_headers, "Accept-Encoding": "identity"}
+    )
+    compressed = await client.get(
+        "/study-items/", headers={**auth_headers, "Accept-Encoding": "gzip"}
+    )
+
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert int(compressed.headers["content-length"]) < len(plain.content) / 4
+    assert compressed.json() == plain.json()
+
+
+@pytest.mark.asyncio
+async def test_small_and_streamed_responses_are_not_compressed(client, auth_headers):
+    small = await client.get(
+        "/dashboard/", headers={**auth_headers, "Accept-Encoding": "gzip"}
+    )
+    assert "content-encoding" not in small.headers
+
+    stream = await client.post(
+        "/ai/ask/stream",
+        json={"question": "Explain compression " + "in detail " * 200},
+        headers={**auth_headers, "Accept-Encoding": "gzip"},
+    )
+    assert "content-encoding" not in stream.headers
+    assert "event: done" in stream.text
+
+
+def test_leaderboard_pages_rendered_once_per_version():
+    from ranking import LeaderboardIndex
+
+    index = LeaderboardIndex()
+    index.load([(1, "a@test.com", 3), (2, "b@test.com", 5)])
+
+    page = index.top_json(10)
+    assert index.top_json(10) is page
+
+    index.update(1, "a@test.com", 9)
+    assert index.top_json(10) is not page
+    assert index.top_json(10).startswith(b'[{"rank":1,"user":"a@test.com","streak":9}')
@@ -0,0 +1,164 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+import models
+import stats
+from migrations import init_db
+from responses import etag, is_fresh
+from tests.conftest import TestingSessionLocal, engine
+
+
+async def get(client, url, headers, tag=None):
+    if tag:
+        headers = {**headers, "If-None-Match": tag}
+    return await client.get(url, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_dashboard_revalidates_until_something_changes(client, auth_headers):
+    first = await get(client, "/dashboard/", auth_headers)
+    tag = first.headers["etag"]
+
+    assert tag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    cached = await get(client, "/dashboard/", auth_headers, tag)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == tag
+
+    await client.post("/study-items/", json={"title": "New", "type": "task"}, headers=auth_headers)
+
+    changed = await get(client, "/dashboard/", auth_headers, tag)
+    assert changed.status_code == 200
+    assert changed.json()["progress"]["total_tasks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_every_item_write_changes_the_list_etag(client, auth_headers):
+    item = (await client.post(
+        "/study-items/", json={"title": "Tracked", "type": "task"}, headers=auth_headers
+    )).json()
+    seen = set()
+
+    async def current_tag():
+        response = await get(client, "/study-items/", auth_headers)
+        assert response.headers["cache-control"] == "private, no-cache"
+        tag = response.headers["etag"]
+        assert tag not in seen
+        seen.add(tag)
+        return tag
+
+    tag = await current_tag()
+    assert (await get(client, "/study-items/", auth_headers, tag)).status_code == 304
+    # Another page or filter is another resource.
+    assert (await get(client, "/study-items/?type=task", auth_headers, tag)).status_code == 200
+
+    await client.put(
+        f"/study-items/{item['id']}",
+        json={"title": "Renamed", "description": None, "completed": None},
+        headers=auth_headers,
+    )
+    await current_tag()
+    await client.patch(f"/study-items/{item['id']}/complete", headers=auth_headers)
+    await current_tag()
+    batch = (await client.post(
+        "/study-items/batch", json={"items": [{"title": "B", "type": "plan"}]}, headers=auth_headers
+    )).json()
+    await current_tag()
+    await client.post(
+        "/study-items/batch/delete", json={"ids": [batch["results"][0]["id"]]}, headers=auth_headers
+    )
+    await current_tag()
+    await client.post(
+        "/study-items/import",
+        files={"file": ("items.ndjson", b'{"title": "I", "type": "task"}\n')},
+        headers=auth_headers,
+    )
+    await current_tag()
+    await client.delete(f"/study-items/{item['id']}", headers=auth_headers)
+    await current_tag()
+
+
+@pytest.mark.asyncio
+async def test_not_modified_list_skips_the_item_table(client, auth_headers):
+    await client.post("/study-items/", json={"title": "Quiet", "type": "task"}, headers=auth_headers)
+    tag = (await get(client, "/study-items/", auth_headers)).headers["etag"]
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = await get(client, "/study-items/", auth_headers, tag)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 304
+    assert statements
+    assert not [s for s in statements if "study_items" in s]
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_etags_follow_the_ranking(client, auth_headers):
+    top = await get(client, "/leaderboard/", auth_headers)
+    me = await get(client, "/leaderboard/me", auth_headers)
+
+    assert top.headers["cache-control"] == "private, max-age=10"
+    assert me.headers["cache-control"] == "private, no-cache"
+    assert (await get(client, "/leaderboard/", auth_headers, top.headers["etag"])).status_code == 304
+    assert (await get(client, "/leaderboard/me", auth_headers, me.headers["etag"])).status_code == 304
+    assert (await get(client, "/leaderboard/?limit=5", auth_headers, top.headers["etag"])).status_code == 200
+
+    item = (await client.post(
+        "/study-items/", json={"title": "Streak", "type": "task"}, headers=auth_headers
+    )).json()
+    await client.patch(f"/study-items/{item['id']}/complete", headers=auth_headers)
+
+    assert (await get(client, "/leaderboard/", auth_headers, top.headers["etag"])).status_code == 200
+    assert (await get(client, "/leaderboard/me", auth_headers, me.headers["etag"])).status_code == 200
+
+
+def test_if_none_match_parsing():
+    tag = etag("x", 1)
+
+    def request(header):
+        return SimpleNamespace(headers={"if-none-match": header} if header else {})
+
+    assert is_fresh(request(tag), tag)
+    assert is_fresh(request(tag.removeprefix("W/")), tag)
+    assert is_fresh(request(f'"other", {tag}'), tag)
+    assert is_fresh(request("*"), tag)
+    assert not is_fresh(request('"other"'), tag)
+    assert not is_fresh(request(None), tag)
+    assert etag("x", 1) != etag("x", 2)
+
+
+def test_rebuild_keeps_revisions_moving_forward():
+    with TestingSessionLocal() as db:
+        before = dict(db.query(models.UserStats.user_id, models.UserStats.revision).all())
+        stats.rebuild_all(db)
+        after = dict(db.query(models.UserStats.user_id, models.UserStats.revision).all())
+
+    assert all(after[user_id] > revision for user_id, revision in before.items())
+
+
+def test_init_db_adds_new_columns_to_existing_tables(tmp_path):
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE user_stats (user_id INTEGER PRIMARY KEY, total_tasks INTEGER NOT NULL, "
+            "completed_tasks INTEGER NOT NULL, total_plans INTEGER NOT NULL, "
+            "completed_plans INTEGER NOT NULL)"
+        ))
+        conn.execute(text("INSERT INTO user_stats VALUES (1, 2, 1, 0, 0)"))
+
+    init_db(legacy)
+    init_db(legacy)
+
+    with legacy.connect() as conn:
+        assert conn.execute(text("SELECT revision FROM user_stats")).scalar() == 0
@@ -0,0 +1,75 @@
+import pytest
+
+@pytest.mark.asyncio
+async def test_dashboard_success(client, auth_headers):
+    response = await client.get(
+        "/dashboard/",
+        headers=auth_headers,
+        follow_redirects=False,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["progress"]["total_tasks"] == 0
+
+
+@pytest.mark.asyncio
+async def test_dashboard_reflects_completed_task(client, auth_headers):
+    # Prime the cached user record before the streak changes.
+    await client.get("/dashboard/", headers=auth_headers)
+
+    created = await client.post(
+        "/study-items/",
+        json={"title": "Revise graphs", "type": "task"},
+        headers=auth_headers,
+    )
+    await client.patch(
+        f"/study-items/{created.json()['id']}/complete",
+        headers=auth_headers,
+    )
+
+    response = await client.get("/dashboard/", headers=auth_headers)
+    data = response.json()
+
+    assert data["progress"]["completed_tasks"] == 1
+    assert data["streak"]["current_streak"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dashboard_counters_follow_item_changes(client, auth_headers):
+    for title, type in [("A", "task"), ("B", "task"), ("C", "plan")]:
+        await client.post(
+            "/study-items/",
+            json={"title": title, "type": type},
+            headers=auth_headers,
+        )
+
+    items = (await client.get("/study-items/", headers=auth_headers)).json()
+    ids = {item["title"]: item["id"] for item in items}
+    await client.patch(f"/study-items/{ids['A']}/complete", headers=auth_headers)
+    await client.delete(f"/study-items/{ids['B']}", headers=auth_headers)
+
+    progress = (await client.get("/dashboard/", headers=auth_headers)).json()
+
+    assert progress["progress"]["total_tasks"] == 1
+    assert progress["progress"]["completed_tasks"] == 1
+    assert progress["plans"]["total_plans"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rebuild_stats_repairs_counters(client, auth_headers):
+    import models, stats
+    from tests.conftest import TestingSessionLocal
+
+    await client.post(
+        "/study-items/",
+        json={"title": "Rebuild me", "type": "task"},
+        headers=auth_headers,
+    )
+
+    with TestingSessionLocal() as db:
+        db.query(models.UserStats).update({"total_tasks": 99})
+        db.commit()
+        assert stats.rebuild_all(db) >= 1
+
+    progress = (await client.get("/dashboard/", headers=auth_headers)).json()
+    assert progress["progress"]["total_tasks"] == 1
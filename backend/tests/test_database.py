@@ -0,0 +1,25 @@
+import database
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    bind = database.build_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+
+    settings = database.describe_engine(bind)
+
+    assert settings["journal_mode"] == "wal"
+    assert settings["synchronous"] == 1  # NORMAL
+    assert settings["busy_timeout"] == database.SQLITE_PRAGMAS["busy_timeout"]
+    assert settings["pool_size"] == database.DB_POOL_SIZE
+    assert settings["max_overflow"] == database.DB_MAX_OVERFLOW
+
+
+def test_memory_sqlite_skips_pool_sizing():
+    bind = database.build_engine("sqlite://")
+
+    assert database.describe_engine(bind)["pool_size"] is None
+
+
+def test_async_url_picks_async_driver():
+    assert database.async_url("sqlite:///./x.db") == "sqlite+aiosqlite:///./x.db"
+    assert database.async_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert database.async_url("postgresql+asyncpg://db/app") == "postgresql+asyncpg://db/app"
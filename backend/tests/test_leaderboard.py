@@ -10,3 +10,78 @@ async def test_leaderboard_success(client, auth_headers):
 
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+async def _user_with_streak(client, completions):
+    import uuid
+
+    email = f"rank_{uuid.uuid4()}@test.com"
+    await client.post("/auth/register", json={"email": email, "password": "password123"})
+    login = await client.post("/auth/login", data={"username": email, "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    for i in range(completions):
+        item = await client.post(
+            "/study-items/", json={"title": f"T{i}", "type": "task"}, headers=headers
+        )
+        await client.patch(f"/study-items/{item.json()['id']}/complete", headers=headers)
+
+    return email, headers
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_tracks_streak_changes(client):
+    email, headers = await _user_with_streak(client, 1)
+
+    me = (await client.get("/leaderboard/me", headers=headers)).json()
+    assert me["user"] == email
+    assert me["streak"] == 1
+
+    page = (await client.get(
+        "/leaderboard/",
+        params={"limit": 1, "offset": me["rank"] - 1},
+        headers=headers,
+    )).json()
+    assert page == [{"rank": me["rank"], "user": email, "streak": 1}]
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_is_sorted(client, auth_headers):
+    await _user_with_streak(client, 1)
+
+    board = (await client.get("/leaderboard/", params={"limit": 100}, headers=auth_headers)).json()
+    streaks = [entry["streak"] for entry in board]
+
+    assert streaks == sorted(streaks, reverse=True)
+    assert [entry["rank"] for entry in board] == list(range(1, len(board) + 1))
+
+
+@pytest.mark.asyncio
+async def test_rank_of_unknown_user(client, auth_headers):
+    response = await client.get("/leaderboard/rank/99999999", headers=auth_headers)
+
+    assert response.status_code == 404
+
+
+def test_ranked_skip_list_matches_sorted_list():
+    import random
+    from ranking import RankedSkipList
+
+    rng = random.Random(7)
+    ranked, expected = RankedSkipList(), []
+
+    for _ in range(2000):
+        if expected and rng.random() < 0.4:
+            key = expected.pop(rng.randrange(len(expected)))
+            ranked.remove(key)
+        else:
+            key = (-rng.randint(0, 30), rng.randint(0, 10**6))
+            if key not in expected:
+                expected.append(key)
+                ranked.insert(key)
+
+    expected.sort()
+    assert len(ranked) == len(expected)
+    assert list(ranked.iter_from(0)) == expected
+    assert all(ranked.rank(key) == i for i, key in enumerate(expected))
+    assert ranked[len(expected) // 2] == expected[len(expected) // 2]
@@ -0,0 +1,73 @@
+import re
+
+import pytest
+
+
+def test_render_prometheus_text():
+    from metrics import Counter, Gauge, Histogram, render
+
+    registry = {}
+    counter = Counter("jobs_total", "Jobs run", labelnames=("kind",), registry=registry)
+    gauge = Gauge("queue_depth", "Queued jobs", registry=registry)
+    histogram = Histogram(
+        "job_seconds", "Job time", buckets=(0.1, 1.0), registry=registry
+    )
+
+    counter.inc('say "hi"')
+    gauge.inc(amount=3)
+    gauge.dec()
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    assert render(registry).splitlines() == [
+        "# HELP jobs_total Jobs run",
+        "# TYPE jobs_total counter",
+        'jobs_total{kind="say \\"hi\\""} 1',
+        "# HELP queue_depth Queued jobs",
+        "# TYPE queue_depth gauge",
+        "queue_depth 2",
+        "# HELP job_seconds Job time",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{le="0.1"} 1',
+        'job_seconds_bucket{le="1.0"} 2',
+        'job_seconds_bucket{le="+Inf"} 3',
+        "job_seconds_sum 5.55",
+        "job_seconds_count 3",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_request_metrics_and_server_timing(client, auth_headers):
+    response = await client.get("/study-items/", headers=auth_headers)
+    assert response.status_code == 200
+
+    timing = response.headers["server-timing"]
+    queries = int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing).group(1))
+    assert queries >= 1
+    assert "app;dur=" in timing
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    body = response.text
+    assert re.search(
+        r'^http_requests_total\{method="GET",route="/study-items/",status="200"\} \d+$',
+        body, re.M,
+    )
+    assert 'http_request_duration_seconds_count{method="GET",route="/study-items/"}' in body
+    assert 'http_request_db_queries_bucket{method="GET",route="/study-items/",le="+Inf"}' in body
+    assert re.search(r'^http_requests_in_progress\{method="GET"\} 1$', body, re.M)
+    assert "password_hash_seconds_bucket" in body
+
+
+@pytest.mark.asyncio
+async def test_unknown_paths_share_one_label(client):
+    from instrumentation import requests_total
+
+    before = requests_total.value("GET", "unmatched", "404")
+    await client.get("/no/such/page/123")
+    await client.get("/no/such/page/456")
+
+    assert requests_total.value("GET", "unmatched", "404") == before + 2
@@ -27,3 +27,230 @@ async def test_pdf_no_file(client, auth_headers):
     )
 
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_pdf_summary_of_real_pdf(client, auth_headers):
+    from tests.conftest import make_pdf
+
+    response = await client.post(
+        "/pdf/summarize",
+        files={"file": ("notes.pdf", make_pdf(["Photosynthesis basics"]), "application/pdf")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert "Photosynthesis" in response.json()["summary"]
+
+
+@pytest.mark.asyncio
+async def test_pdf_too_large(client, auth_headers, monkeypatch):
+    import pdf_extract
+    from tests.conftest import make_pdf
+
+    monkeypatch.setattr(pdf_extract, "PDF_MAX_BYTES", 100)
+
+    response = await client.post(
+        "/pdf/summarize",
+        files={"file": ("big.pdf", make_pdf(["x" * 200]), "application/pdf")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_extract_text_fans_out_pages_and_caches(monkeypatch):
+    import pdf_extract
+    from tests.conftest import make_pdf
+
+    monkeypatch.setattr(pdf_extract, "PDF_PAGES_PER_TASK", 2)
+    data = make_pdf([f"Page {i}" for i in range(5)])
+
+    text = await pdf_extract.extract_text(data)
+    assert text.splitlines() == [f"Page {i}" for i in range(5)]
+
+    # Re-upload of the same bytes never reaches the pool.
+    monkeypatch.setattr(pdf_extract, "_get_executor", None)
+    assert await pdf_extract.extract_text(data) == text
+
+
+@pytest.mark.asyncio
+async def test_pdf_job_runs_in_background(client, auth_headers, tmp_path, monkeypatch):
+    import uuid
+    import pdf_jobs
+    from tests.conftest import make_pdf
+
+    monkeypatch.setattr(pdf_jobs, "PDF_SPOOL_DIR", str(tmp_path))
+    data = make_pdf([f"Mitochondria {uuid.uuid4().hex}"])
+
+    response = await client.post(
+        "/pdf/jobs",
+        files={"file": ("cells.pdf", data, "application/pdf")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert response.headers["location"] == f"/pdf/jobs/{job['id']}"
+
+    await pdf_jobs.queue.join()
+
+    response = await client.get(f"/pdf/jobs/{job['id']}", headers=auth_headers)
+    assert response.status_code == 200
+    done = response.json()
+    assert done["status"] == "done"
+    assert "Mitochondria" in done["summary"]
+    assert done["finished_at"] is not None
+    # The spooled upload is removed once the job finishes.
+    assert list(tmp_path.iterdir()) == []
+
+    # The same bytes map to the same job without another run.
+    again = await client.post(
+        "/pdf/jobs",
+        files={"file": ("copy.pdf", data, "application/pdf")},
+        headers=auth_headers,
+    )
+    assert again.json()["id"] == job["id"]
+    assert again.json()["status"] == "done"
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_pdf_job_shared_across_users_keeps_their_filenames(
+    client, auth_headers, other_auth_headers, tmp_path, monkeypatch
+):
+    import uuid
+    import pdf_jobs
+    from tests.conftest import make_pdf
+
+    monkeypatch.setattr(pdf_jobs, "PDF_SPOOL_DIR", str(tmp_path))
+    data = make_pdf([f"Photosynthesis {uuid.uuid4().hex}"])
+
+    mine = (await client.post(
+        "/pdf/jobs",
+        files={"file": ("mine.pdf", data, "application/pdf")},
+        headers=auth_headers,
+    )).json()
+    location = f"/pdf/jobs/{mine['id']}"
+    # The test engine shares one connection, so no writes while a job runs.
+    await pdf_jobs.queue.join()
+
+    # Not visible to a user who never uploaded the file.
+    assert (await client.get(location, headers=other_auth_headers)).status_code == 404
+
+    theirs = (await client.post(
+        "/pdf/jobs",
+        files={"file": ("theirs.pdf", data, "application/pdf")},
+        headers=other_auth_headers,
+    )).json()
+
+    assert theirs["id"] == mine["id"]
+    assert theirs["filename"] == "theirs.pdf"
+    assert (await client.get(location, headers=auth_headers)).json()["filename"] == "mine.pdf"
+    done = (await client.get(location, headers=other_auth_headers)).json()
+    assert done["filename"] == "theirs.pdf"
+    assert "Photosynthesis" in done["summary"]
+
+
+@pytest.mark.asyncio
+async def test_pdf_job_failure_is_recorded(client, auth_headers, tmp_path, monkeypatch):
+    import uuid
+    import pdf_jobs
+
+    monkeypatch.setattr(pdf_jobs, "PDF_SPOOL_DIR", str(tmp_path))
+
+    response = await client.post(
+        "/pdf/jobs",
+        files={"file": ("bad.pdf", uuid.uuid4().bytes, "application/pdf")},
+        headers=auth_headers,
+    )
+    await pdf_jobs.queue.join()
+
+    job = (await client.get(response.headers["location"], headers=auth_headers)).json()
+    assert job["status"] == "failed"
+    assert job["error"] == "File is not a readable PDF"
+
+
+@pytest.mark.asyncio
+async def test_pdf_job_not_found(client, auth_headers):
+    response = await client.get("/pdf/jobs/missing", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_interrupted_pdf_jobs_resume_on_start(tmp_path, monkeypatch):
+    import uuid
+    from datetime import datetime
+    import models
+    import pdf_jobs
+    from tests.conftest import TestingSessionLocal, make_pdf
+
+    path = tmp_path / "interrupted.pdf"
+    path.write_bytes(make_pdf(["Osmosis"]))
+    job_id = uuid.uuid4().hex
+    with TestingSessionLocal() as db:
+        db.add(models.PdfJob(
+            id=job_id,
+            file_hash=uuid.uuid4().hex,
+            spool_path=str(path),
+            status="running",
+            created_at=datetime.now(),
+        ))
+        db.commit()
+
+    try:
+        assert await pdf_jobs.queue.start() >= 1
+        await pdf_jobs.queue.join()
+    finally:
+        await pdf_jobs.queue.stop()
+
+    with TestingSessionLocal() as db:
+        job = db.get(models.PdfJob, job_id)
+        assert job.status == "done"
+        assert "Osmosis" in job.summary
+    assert not path.exists()
+
+
+@pytest.mark.asyncio
+async def test_pdf_job_claimed_once_and_live_jobs_not_reclaimed(monkeypatch):
+    import asyncio
+    import uuid
+    from datetime import datetime
+    import models
+    import pdf_jobs
+    from tests.conftest import TestingSessionLocal
+
+    queued, live = uuid.uuid4().hex, uuid.uuid4().hex
+    with TestingSessionLocal() as db:
+        db.add(models.PdfJob(id=queued, file_hash=uuid.uuid4().hex, status="queued"))
+        # Running in another worker, which keeps its heartbeat fresh.
+        db.add(models.PdfJob(
+            id=live, file_hash=uuid.uuid4().hex, status="running",
+            heartbeat_at=datetime.now(),
+        ))
+        db.commit()
+
+    runs = []
+
+    async def summarize(job_id, path, digest):
+        runs.append(job_id)
+        await asyncio.sleep(0.01)
+        return "summary"
+
+    monkeypatch.setattr(pdf_jobs.queue, "_summarize", summarize)
+    # Two workers that both picked the job up on startup.
+    await asyncio.gather(pdf_jobs.queue._run(queued), pdf_jobs.queue._run(queued))
+    assert runs == [queued]
+
+    try:
+        await pdf_jobs.queue.start()
+        await pdf_jobs.queue.join()
+    finally:
+        await pdf_jobs.queue.stop()
+
+    with TestingSessionLocal() as db:
+        assert db.get(models.PdfJob, queued).status == "done"
+        assert db.get(models.PdfJob, live).status == "running"
+        db.delete(db.get(models.PdfJob, live))
+        db.commit()
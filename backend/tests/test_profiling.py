@@ -0,0 +1,106 @@
+import marshal
+import pstats
+import re
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+import profiling
+from main import app
+
+
+@pytest.fixture
+def profiled(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "secret")
+    profiling.profiles.clear()
+    yield
+    profiling.profiles.clear()
+
+
+def profiled_client(**options):
+    transport = ASGITransport(app=profiling.ProfilingMiddleware(app, **options))
+    return AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_profile_requested_by_header(client, auth_headers, profiled, tmp_path):
+    async with profiled_client(sample_rate=0) as profiled_app:
+        plain = await profiled_app.get("/dashboard/", headers=auth_headers)
+        response = await profiled_app.get(
+            "/dashboard/", headers={**auth_headers, "X-Profile-Token": "secret"}
+        )
+
+    assert "x-profile-id" not in plain.headers
+    profile_id = response.headers["x-profile-id"]
+    admin = {"X-Profile-Token": "secret"}
+
+    listed = (await client.get("/admin/profiles/", headers=admin)).json()
+    assert [(p["id"], p["route"], p["trigger"]) for p in listed] == [
+        (int(profile_id), "/dashboard/", "header")
+    ]
+
+    text = await client.get(f"/admin/profiles/{profile_id}", headers=admin)
+    assert "function calls" in text.text
+
+    collapsed = await client.get(
+        f"/admin/profiles/{profile_id}", params={"format": "collapsed"}, headers=admin
+    )
+    lines = collapsed.text.splitlines()
+    assert lines and all(re.fullmatch(r"\S.* \d+", line) for line in lines)
+    assert any("get_dashboard" in line for line in lines)
+
+    dump = await client.get(
+        f"/admin/profiles/{profile_id}", params={"format": "pstats"}, headers=admin
+    )
+    path = tmp_path / "profile.pstats"
+    path.write_bytes(dump.content)
+    assert marshal.loads(dump.content)
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+@pytest.mark.asyncio
+async def test_admin_profiles_require_token(client, profiled):
+    assert (await client.get("/admin/profiles/")).status_code == 403
+    response = await client.get("/admin/profiles/", headers={"X-Profile-Token": "wrong"})
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_every_request_past_the_slow_threshold_is_kept(auth_headers, profiled):
+    async with profiled_client(sample_rate=0, slow_ms=60_000) as profiled_app:
+        await profiled_app.get("/leaderboard/", headers=auth_headers)
+    assert profiling.profiles.summaries() == []
+
+    # Not sampled, but over the threshold.
+    async with profiled_client(sample_rate=0, slow_ms=0.001) as profiled_app:
+        response = await profiled_app.get("/leaderboard/", headers=auth_headers)
+
+    # Only requested profiles advertise themselves.
+    assert "x-profile-id" not in response.headers
+    [summary] = profiling.profiles.summaries()
+    assert summary["trigger"] == "slow"
+    assert summary["status"] == 200
+
+
+@pytest.mark.asyncio
+async def test_sampled_profiles_are_kept(auth_headers, profiled):
+    async with profiled_client(sample_rate=1.0, slow_ms=60_000) as profiled_app:
+        await profiled_app.get("/leaderboard/", headers=auth_headers)
+
+    [summary] = profiling.profiles.summaries()
+    assert summary["trigger"] == "sample"
+
+
+def test_store_keeps_the_slowest():
+    store = profiling.ProfileStore(maxlen=2)
+    for duration_ms in (30, 10, 50, 20):
+        store.add({"id": store.next_id(), "duration_ms": duration_ms, "stats": {}})
+
+    assert [(p["id"], p["duration_ms"]) for p in store.summaries()] == [(3, 50), (1, 30)]
+    assert store.get(2) is None
+    assert store.get(1)["stats"] == {}
+
+
+def test_disabled_by_default():
+    assert not profiling.PROFILING_ENABLED
+    assert profiling.ProfilingMiddleware not in [m.cls for m in app.user_middleware]
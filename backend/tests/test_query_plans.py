@@ -0,0 +1,122 @@
+import re
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+
+from tests.conftest import engine, TestingSessionLocal
+from migrations import init_db
+import ranking
+
+
+# "SCAN study_items" is a full table scan; "SCAN ... USING INDEX" and
+# "SEARCH ..." are index driven.
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+@pytest.fixture
+def captured_sql():
+    # Loading the leaderboard index reads every user by design; it is a
+    # startup job, not a per-request query.
+    with TestingSessionLocal() as db:
+        ranking.leaderboard.rebuild(db)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def explain(statement, parameters):
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+    finally:
+        raw.close()
+
+
+async def exercise_every_router(client):
+    email = f"plan_{uuid.uuid4()}@test.com"
+    await client.post("/auth/register", json={"email": email, "password": "password123"})
+    login = await client.post("/auth/login", data={"username": email, "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    task = (await client.post(
+        "/study-items/", json={"title": "Plan check", "type": "task"}, headers=headers
+    )).json()
+    await client.post(
+        "/study-items/", json={"title": "Plan check", "type": "plan"}, headers=headers
+    )
+
+    await client.get("/study-items/", headers=headers)
+    await client.get("/study-items/?type=task", headers=headers)
+    await client.get(
+        "/study-items/?completed=false&limit=1&cursor=1&fields=title", headers=headers
+    )
+    await client.get(f"/study-items/{task['id']}", headers=headers)
+    await client.get("/study-items/search?q=plan&type=task", headers=headers)
+    await client.put(
+        f"/study-items/{task['id']}",
+        json={"title": "Renamed", "description": None, "completed": None},
+        headers=headers,
+    )
+    await client.patch(f"/study-items/{task['id']}/complete", headers=headers)
+    await client.get("/dashboard/", headers=headers)
+    await client.get("/analytics/activity?bucket=week", headers=headers)
+    await client.get("/leaderboard/", headers=headers)
+    await client.get("/leaderboard/me", headers=headers)
+    await client.delete(f"/study-items/{task['id']}", headers=headers)
+
+    batch = (await client.post(
+        "/study-items/batch",
+        json={"items": [{"title": "Batch", "type": "task"}]},
+        headers=headers,
+    )).json()
+    ids = [result["id"] for result in batch["results"]]
+    await client.patch("/study-items/batch/complete", json={"ids": ids}, headers=headers)
+    await client.post("/study-items/batch/delete", json={"ids": ids}, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_router_queries_use_indexes(client, captured_sql):
+    await exercise_every_router(client)
+
+    assert captured_sql
+
+    scans = []
+    for statement, parameters in captured_sql:
+        for detail in explain(statement, parameters):
+            if FULL_SCAN.match(detail):
+                scans.append(f"{detail}: {statement}")
+
+    assert not scans, "\n".join(scans)
+
+
+def test_init_db_adds_indexes_to_existing_database(tmp_path):
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+
+    # Schema as shipped before any indexes existed on study_items.
+    with legacy.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR NOT NULL, "
+            "hashed_password VARCHAR NOT NULL, current_streak INTEGER, "
+            "last_completed_date DATE)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE study_items (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+            "description VARCHAR, type VARCHAR, completed BOOLEAN, "
+            "completed_date DATE, owner_id INTEGER REFERENCES users(id))"
+        ))
+
+    init_db(legacy)
+    init_db(legacy)  # idempotent
+
+    indexes = {ix["name"] for ix in inspect(legacy).get_indexes("study_items")}
+    assert {"ix_study_items_owner_type_completed", "ix_study_items_owner_id_id"} <= indexes
@@ -0,0 +1,149 @@
+import time
+import uuid
+
+import pytest
+
+import ratelimit
+from ratelimit import BucketStore, Limit, Limiter, MemoryBucketStore
+
+# Mean cost of one check; the limiter must stay far below a request's own.
+OVERHEAD_BUDGET_US = 50
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = Limiter(enabled=True)
+    limiter.caller = Limit(capacity=20, per_second=1)
+    monkeypatch.setattr(ratelimit, "limiter", limiter)
+    return limiter
+
+
+def test_bucket_refills_and_reports_the_wait():
+    store = MemoryBucketStore()
+    limit = Limit(capacity=10, per_second=2)
+    buckets = (("user:1", limit),)
+
+    assert store.acquire(buckets, 6, now=0) == (0.0, "")
+    assert store.acquire(buckets, 6, now=0) == (1.0, "user:1")  # 4 left, 2 missing
+    assert store.acquire(buckets, 6, now=1) == (0.0, "")        # refilled to 6
+    assert store.acquire(buckets, 1, now=100) == (0.0, "")      # capped at capacity
+    assert store.acquire(buckets, 10, now=100) == (0.5, "user:1")
+    assert store.acquire(buckets, 11, now=1000)[0] == float("inf")
+
+
+def test_buckets_are_charged_all_or_nothing():
+    store = MemoryBucketStore()
+    caller, everyone = Limit(10, 1), Limit(5, 1)
+    buckets = (("user:1", caller), ("global", everyone))
+
+    assert store.acquire(buckets, 5, now=0) == (0.0, "")
+    assert store.acquire(buckets, 5, now=0) == (5.0, "global")
+    # The refused request took nothing from the caller's bucket.
+    assert store.acquire((("user:1", caller),), 5, now=0) == (0.0, "")
+
+
+def test_full_buckets_are_pruned_past_max_keys():
+    store = MemoryBucketStore(max_keys=2)
+    limit = Limit(capacity=10, per_second=10)
+
+    for n in range(3):
+        store.acquire(((f"ip:{n}", limit),), 1, now=n * 0.01)
+    store.acquire((("ip:new", limit),), 1, now=5)
+
+    assert len(store) == 1
+
+
+def test_buckets_are_pruned_at_their_own_refill_rate():
+    store = MemoryBucketStore(max_keys=1)
+    caller, everyone = Limit(10, 10), Limit(10, 0.1)  # full after 1s and 100s
+
+    store.acquire((("ip:1", caller), ("global", everyone)), 10, now=0)
+    store.acquire((("ip:2", caller),), 1, now=5)
+
+    # The caller bucket has refilled and goes; the global one has not.
+    assert len(store) == 2
+    assert store.acquire((("global", everyone),), 1, now=5)[1] == "global"
+
+
+def test_incomplete_store_fails_when_created():
+    class NoClear(BucketStore):
+        def acquire(self, buckets, cost, now):
+            return 0.0, ""
+
+    with pytest.raises(TypeError):
+        NoClear()
+
+
+@pytest.mark.asyncio
+async def test_login_is_limited_per_ip(client, limiter):
+    form = {"username": "nobody@test.com", "password": "password123"}
+
+    assert (await client.post("/auth/login", data=form)).status_code == 401
+    assert (await client.post("/auth/login", data=form)).status_code == 401
+    response = await client.post("/auth/login", data=form)
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "10"
+    assert ratelimit.rejected.value("login", "caller") >= 1
+
+
+@pytest.mark.asyncio
+async def test_ai_is_limited_per_user(client, auth_headers, limiter):
+    ask = {"question": "What is a token bucket?"}
+
+    for _ in range(2):
+        assert (await client.post("/ai/ask", json=ask, headers=auth_headers)).status_code == 200
+    limited = await client.post("/ai/ask", json=ask, headers=auth_headers)
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) > 0
+
+    # Other users have their own bucket; the CRUD routes are not limited.
+    email = f"limit_{uuid.uuid4()}@test.com"
+    limiter.enabled = False
+    await client.post("/auth/register", json={"email": email, "password": "password123"})
+    login = await client.post("/auth/login", data={"username": email, "password": "password123"})
+    limiter.enabled = True
+    other = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert (await client.post("/ai/ask", json=ask, headers=other)).status_code == 200
+    assert (await client.get("/dashboard/", headers=auth_headers)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_global_bucket_limits_everyone(client, auth_headers, limiter):
+    limiter.everyone["ai"] = Limit(capacity=10, per_second=0.1)
+    ask = {"question": "Shared budget?"}
+
+    assert (await client.post("/ai/ask", json=ask, headers=auth_headers)).status_code == 200
+    response = await client.post("/ai/ask", json=ask, headers=auth_headers)
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "100"
+    assert ratelimit.rejected.value("ai", "global") >= 1
+
+
+@pytest.mark.asyncio
+async def test_login_flood_leaves_other_groups_alone(client, auth_headers, limiter):
+    limiter.caller = Limit(capacity=1e6, per_second=1)
+    limiter.everyone["login"] = Limit(capacity=20, per_second=0.1)
+    form = {"username": "nobody@test.com", "password": "password123"}
+
+    for _ in range(2):
+        await client.post("/auth/login", data=form)
+    assert (await client.post("/auth/login", data=form)).status_code == 429
+
+    ask = {"question": "Still answered?"}
+    assert (await client.post("/ai/ask", json=ask, headers=auth_headers)).status_code == 200
+
+
+def test_check_overhead_stays_in_microseconds():
+    limiter = Limiter(enabled=True)
+    limiter.caller = limiter.everyone["ai"] = Limit(capacity=1e12, per_second=1e12)
+    callers = [f"user:{n}" for n in range(1000)]
+
+    rounds = 20_000
+    start = time.perf_counter()
+    for n in range(rounds):
+        limiter.check("ai", callers[n % 1000], 10)
+    mean_us = (time.perf_counter() - start) / rounds * 1e6
+
+    assert mean_us < OVERHEAD_BUDGET_US, f"{mean_us:.1f}µs per check"
@@ -0,0 +1,139 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from migrations import init_db
+
+
+async def create(client, headers, title, description=None, type="task"):
+    response = await client.post(
+        "/study-items/",
+        json={"title": title, "description": description, "type": type},
+        headers=headers,
+    )
+    return response.json()
+
+
+async def search(client, headers, **params):
+    return await client.get("/study-items/search", params=params, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_and_highlights(client, auth_headers):
+    in_description = await create(
+        client, auth_headers, "Biology revision", "Read about photosynthesis in plants"
+    )
+    in_title = await create(client, auth_headers, "Photosynthesis summary", "Chapter 4")
+    await create(client, auth_headers, "Algebra drills", "Quadratic equations")
+
+    response = await search(client, auth_headers, q="photosynthesis")
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["id"] for r in results] == [in_title["id"], in_description["id"]]
+    assert results[0]["score"] > results[1]["score"]
+    assert "<mark>photosynthesis</mark>" in results[1]["snippet"].lower()
+    assert set(results[0]) >= {"title", "description", "type", "completed", "snippet"}
+
+
+@pytest.mark.asyncio
+async def test_search_follows_updates_and_deletes(client, auth_headers):
+    item = await create(client, auth_headers, "Thermodynamics notes")
+    assert len((await search(client, auth_headers, q="thermo")).json()) == 1  # prefix
+
+    await client.put(
+        f"/study-items/{item['id']}",
+        json={"title": "Kinematics notes", "description": None, "completed": None},
+        headers=auth_headers,
+    )
+    assert (await search(client, auth_headers, q="thermodynamics")).json() == []
+    assert len((await search(client, auth_headers, q="kinematics")).json()) == 1
+
+    await client.delete(f"/study-items/{item['id']}", headers=auth_headers)
+    assert (await search(client, auth_headers, q="kinematics")).json() == []
+
+    await client.post(
+        "/study-items/batch",
+        json={"items": [{"title": "Batch entropy", "type": "plan"}]},
+        headers=auth_headers,
+    )
+    [found] = (await search(client, auth_headers, q="entropy", type="plan")).json()
+    assert found["title"] == "Batch entropy"
+    assert (await search(client, auth_headers, q="entropy", type="task")).json() == []
+
+
+@pytest.mark.asyncio
+async def test_search_is_scoped_to_the_owner(client, auth_headers):
+    await create(client, auth_headers, "Private mnemonic")
+
+    other = f"other_{id(client)}@test.com"
+    await client.post("/auth/register", json={"email": other, "password": "password123"})
+    login = await client.post("/auth/login", data={"username": other, "password": "password123"})
+    other_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    assert (await search(client, other_headers, q="mnemonic")).json() == []
+
+
+@pytest.mark.asyncio
+async def test_search_pagination_and_input_handling(client, auth_headers):
+    for n in range(3):
+        await create(client, auth_headers, f"Vocabulary list {n}")
+
+    first = await search(client, auth_headers, q="vocabulary", limit=2)
+    assert len(first.json()) == 2
+    rest = await search(
+        client, auth_headers, q="vocabulary", limit=2, cursor=first.headers["x-next-cursor"]
+    )
+    assert len(rest.json()) == 1
+    assert "x-next-cursor" not in rest.headers
+    assert {r["id"] for r in first.json()}.isdisjoint(r["id"] for r in rest.json())
+
+    # FTS syntax in the input is searched for, not parsed.
+    for q in ['vocabulary"', "vocabulary OR", "title:vocabulary", "NEAR(vocabulary"]:
+        assert (await search(client, auth_headers, q=q)).status_code == 200
+
+    assert (await search(client, auth_headers, q="!!")).status_code == 400
+    assert (await search(client, auth_headers, q="")).status_code == 422
+
+
+def test_init_db_backfills_search_index(tmp_path):
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE study_items (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+            "description VARCHAR, type VARCHAR, completed BOOLEAN, "
+            "completed_date DATE, owner_id INTEGER)"
+        ))
+        conn.execute(text(
+            "INSERT INTO study_items (title, type, owner_id) VALUES ('Existing genetics notes', 'task', 1)"
+        ))
+
+    init_db(legacy)
+    init_db(legacy)  # idempotent
+
+    with legacy.connect() as conn:
+        hits = conn.execute(text(
+            "SELECT rowid FROM study_items_fts WHERE study_items_fts MATCH 'genetics'"
+        )).scalars().all()
+    assert hits == [1]
+
+
+def test_rebuild_search_job(tmp_path, monkeypatch):
+    import jobs
+    from sqlalchemy.orm import sessionmaker
+
+    bind = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(bind)
+    with bind.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO study_items (title, type, owner_id) VALUES ('Optics', 'task', 1)"
+        ))
+        # Simulate an index that drifted from its content table.
+        conn.execute(text("INSERT INTO study_items_fts(study_items_fts) VALUES ('delete-all')"))
+
+    monkeypatch.setattr(jobs, "SessionLocal", sessionmaker(bind=bind))
+    assert jobs.run_job("rebuild-search")["rows"] == 1
+
+    with bind.connect() as conn:
+        assert conn.execute(text(
+            "SELECT count(*) FROM study_items_fts WHERE study_items_fts MATCH 'optics'"
+        )).scalar() == 1
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def import_times(module: str, env: dict) -> dict:
+    """Cumulative import time in microseconds per module, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def startup_env(database: Path) -> dict:
+    return {
+        **os.environ,
+        "AI_MODEL": "gemini",
+        "GEMINI_API_KEY": "",
+        "DATABASE_URL": f"sqlite:///{database}",
+    }
+
+
+def test_app_import_is_lazy(tmp_path):
+    database = tmp_path / "startup.db"
+
+    times = import_times("main", startup_env(database))
+
+    # The Gemini SDK loads on the first AI request, not at import.
+    assert not any(name.startswith("google.generativeai") for name in times)
+    # A missing key no longer stops the app from importing.
+    assert "main" in times
+    # Schema creation waits for the lifespan hook.
+    assert not database.exists()
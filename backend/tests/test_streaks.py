@@ -0,0 +1,82 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import jobs
+import models
+import ranking
+import user_cache
+from jobs import seconds_until
+from streaks import expire_stale_streaks, update_user_streak
+from tests.conftest import TestingSessionLocal
+
+
+def _user(db, email, streak, last_completed):
+    user = models.User(
+        email=email,
+        hashed_password="x",
+        current_streak=streak,
+        last_completed_date=last_completed,
+    )
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def test_update_user_streak_consecutive_and_broken():
+    user = models.User(current_streak=3, last_completed_date=date.today() - timedelta(days=1))
+    update_user_streak(user)
+    assert user.current_streak == 4
+
+    user = models.User(current_streak=3, last_completed_date=date.today() - timedelta(days=3))
+    update_user_streak(user)
+    assert user.current_streak == 1
+
+
+def test_expire_stale_streaks_resets_only_broken_streaks():
+    today = date.today()
+
+    with TestingSessionLocal() as db:
+        ranking.leaderboard.rebuild(db)
+        stale = _user(db, "stale@streak.com", 5, today - timedelta(days=3))
+        alive = _user(db, "alive@streak.com", 2, today - timedelta(days=1))
+        user_cache.users.set(stale, "cached")
+
+        assert expire_stale_streaks(db, today) >= 1
+
+        assert db.get(models.User, stale).current_streak == 0
+        assert db.get(models.User, alive).current_streak == 2
+
+    assert stale not in user_cache.users
+    assert ranking.leaderboard.rank_of(stale)["streak"] == 0
+    assert ranking.leaderboard.rank_of(alive)["streak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_nightly_expiry_drops_caches_in_every_worker(monkeypatch):
+    # Another worker's run expired the streaks: this one's UPDATE finds none.
+    monkeypatch.setattr(jobs, "run_job", lambda name: {"job": name, "rows": 0})
+    with TestingSessionLocal() as db:
+        ranking.leaderboard.rebuild(db)
+    user_cache.users.set(1, "cached")
+    seen = []
+
+    async def sleep(seconds):
+        seen.append((1 in user_cache.users, ranking.leaderboard.needs_reload()))
+        if len(seen) == 2:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    with pytest.raises(asyncio.CancelledError):
+        await jobs.run_nightly_streak_expiry()
+
+    # Kept by the catch-up pass at startup, dropped by the nightly one.
+    assert seen == [(True, False), (False, True)]
+
+
+def test_seconds_until_next_run():
+    now = datetime(2026, 1, 1, 23, 0)
+
+    assert seconds_until("00:05", now) == 65 * 60
+    assert seconds_until("23:30", now) == 30 * 60
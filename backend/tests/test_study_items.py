@@ -22,3 +22,200 @@ async def test_get_study_items(client, auth_headers):
 
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+@pytest.mark.asyncio
+async def test_get_study_items_keyset_pagination(client, auth_headers):
+    for i in range(5):
+        await client.post(
+            "/study-items/",
+            json={"title": f"Chapter {i}", "type": "task"},
+            headers=auth_headers,
+        )
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/study-items/", params=params, headers=auth_headers)
+        seen.extend(item["title"] for item in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert seen == [f"Chapter {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_get_study_items_filters_and_projection(client, auth_headers):
+    created = await client.post(
+        "/study-items/",
+        json={"title": "Done", "description": "long text", "type": "task"},
+        headers=auth_headers,
+    )
+    await client.post(
+        "/study-items/",
+        json={"title": "Open", "type": "task"},
+        headers=auth_headers,
+    )
+    await client.patch(f"/study-items/{created.json()['id']}/complete", headers=auth_headers)
+
+    response = await client.get(
+        "/study-items/",
+        params={"completed": "true", "fields": "title"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": created.json()["id"], "title": "Done"}]
+
+
+@pytest.mark.asyncio
+async def test_get_study_items_unknown_field(client, auth_headers):
+    response = await client.get(
+        "/study-items/",
+        params={"fields": "title,owner_id"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_batch_create_complete_delete(client, auth_headers):
+    created = await client.post(
+        "/study-items/batch",
+        json={"items": [
+            {"title": "Week 1", "type": "task"},
+            {"title": "Week 2", "type": "essay"},
+            {"title": "Semester", "type": "plan"},
+        ]},
+        headers=auth_headers,
+    )
+
+    assert created.status_code == 200
+    body = created.json()
+    assert body["succeeded"] == 2
+    assert [r["status"] for r in body["results"]] == ["created", "invalid", "created"]
+    task_id = body["results"][0]["id"]
+    plan_id = body["results"][2]["id"]
+
+    completed = await client.patch(
+        "/study-items/batch/complete",
+        json={"ids": [task_id, task_id, 999999]},
+        headers=auth_headers,
+    )
+
+    body = completed.json()
+    assert [r["status"] for r in body["results"]] == ["completed", "not_found"]
+    assert body["current_streak"] == 1
+
+    deleted = await client.post(
+        "/study-items/batch/delete",
+        json={"ids": [task_id, plan_id]},
+        headers=auth_headers,
+    )
+
+    assert deleted.json()["succeeded"] == 2
+
+    dashboard = (await client.get("/dashboard/", headers=auth_headers)).json()
+    assert dashboard["progress"]["total_tasks"] == 0
+    assert dashboard["plans"]["total_plans"] == 0
+
+
+@pytest.mark.asyncio
+async def test_overlapping_batch_completes_count_once(client, auth_headers, monkeypatch):
+    from routers import study_items
+
+    created = await client.post(
+        "/study-items/batch",
+        json={"items": [{"title": f"Task {i}", "type": "task"} for i in range(3)]},
+        headers=auth_headers,
+    )
+    a, b, c = [r["id"] for r in created.json()["results"]]
+
+    # The second batch lands after the first has read its items as pending.
+    owned_items = study_items._owned_items
+    racing = {}
+
+    async def read_then_race(db, user_id, ids):
+        owned = await owned_items(db, user_id, ids)
+        if not racing:
+            racing["second"] = None
+            racing["second"] = await client.patch(
+                "/study-items/batch/complete", json={"ids": [b, c]}, headers=auth_headers
+            )
+        return owned
+
+    monkeypatch.setattr(study_items, "_owned_items", read_then_race)
+    first = (await client.patch(
+        "/study-items/batch/complete", json={"ids": [a, b]}, headers=auth_headers
+    )).json()
+    second = racing["second"].json()
+
+    assert second["succeeded"] == 2
+    assert first["succeeded"] == 1
+    assert [r["status"] for r in first["results"]] == ["completed", "already_completed"]
+
+    dashboard = (await client.get("/dashboard/", headers=auth_headers)).json()
+    assert dashboard["progress"]["total_tasks"] == 3
+    assert dashboard["progress"]["completed_tasks"] == 3
+
+
+@pytest.mark.asyncio
+async def test_single_complete_racing_batch_counts_once(client, auth_headers, monkeypatch):
+    from routers import study_items
+
+    created = await client.post(
+        "/study-items/", json={"title": "Race", "type": "task"}, headers=auth_headers
+    )
+    item_id = created.json()["id"]
+
+    get_owned_item = study_items._get_owned_item
+
+    async def read_then_race(db, item_id, user_id):
+        item = await get_owned_item(db, item_id, user_id)
+        await client.patch(
+            "/study-items/batch/complete", json={"ids": [item_id]}, headers=auth_headers
+        )
+        return item
+
+    monkeypatch.setattr(study_items, "_get_owned_item", read_then_race)
+    response = await client.patch(f"/study-items/{item_id}/complete", headers=auth_headers)
+
+    assert response.json()["message"] == "Item already completed"
+    dashboard = (await client.get("/dashboard/", headers=auth_headers)).json()
+    assert dashboard["progress"]["completed_tasks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_overlapping_deletes_count_once(client, auth_headers):
+    created = await client.post(
+        "/study-items/batch",
+        json={"items": [{"title": f"Task {i}", "type": "task"} for i in range(3)]},
+        headers=auth_headers,
+    )
+    a, b, c = [r["id"] for r in created.json()["results"]]
+    await client.patch(
+        "/study-items/batch/complete", json={"ids": [a, b, c]}, headers=auth_headers
+    )
+
+    first = await client.post(
+        "/study-items/batch/delete", json={"ids": [a, b]}, headers=auth_headers
+    )
+    second = await client.post(
+        "/study-items/batch/delete", json={"ids": [b, c]}, headers=auth_headers
+    )
+    again = await client.delete(f"/study-items/{c}", headers=auth_headers)
+
+    assert first.json()["succeeded"] == 2
+    assert [r["status"] for r in second.json()["results"]] == ["not_found", "deleted"]
+    assert again.status_code == 404
+
+    dashboard = (await client.get("/dashboard/", headers=auth_headers)).json()
+    assert dashboard["progress"]["total_tasks"] == 0
+    assert dashboard["progress"]["completed_tasks"] == 0
+    history = (await client.get("/analytics/activity", headers=auth_headers)).json()
+    assert sum(day["completed_tasks"] for day in history["series"]) == 0
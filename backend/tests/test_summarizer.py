@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import summarizer
+from summarizer import Summarizer, estimate_tokens, split_into_chunks
+
+
+class StubModel:
+    def __init__(self):
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return SimpleNamespace(text=f"summary({len(prompt)})")
+
+
+@pytest.fixture(autouse=True)
+def empty_chunk_cache():
+    summarizer.chunk_cache.clear()
+    yield
+    summarizer.chunk_cache.clear()
+
+
+def test_split_into_chunks_respects_budget():
+    text = "\n".join(f"Line {i} " + "word " * 30 for i in range(100))
+
+    chunks = split_into_chunks(text, max_tokens=100)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 101 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+@pytest.mark.asyncio
+async def test_small_text_is_one_call():
+    model = StubModel()
+
+    await Summarizer(model).summarize("Short notes.")
+
+    assert len(model.prompts) == 1
+    assert model.prompts[0].startswith("Summarize the following study material")
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_is_bounded_and_reports_progress():
+    model = StubModel()
+    progress = []
+    text = "\n".join(f"Paragraph {i}: " + "content " * 40 for i in range(60))
+
+    summary = await Summarizer(
+        model, max_tokens=200, concurrency=3,
+        on_progress=lambda done, total: progress.append((done, total)),
+    ).summarize(text)
+
+    assert summary.startswith("summary(")
+    assert model.peak <= 3
+    assert any(p.startswith("Combine these partial summaries") for p in model.prompts)
+    assert progress[-1][0] == progress[-1][1] == len(model.prompts)
+
+
+@pytest.mark.asyncio
+async def test_identical_chunks_are_not_resent():
+    model = StubModel()
+    text = "\n".join(["Repeated section. " * 20] * 10)
+
+    await Summarizer(model, max_tokens=120).summarize(text)
+    first = len(model.prompts)
+    await Summarizer(model, max_tokens=120).summarize(text)
+
+    assert len(set(model.prompts)) == len(model.prompts)
+    assert len(model.prompts) == first
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import uuid
+
+import pytest
+
+import transfer
+
+
+async def new_user(client):
+    email = f"transfer_{uuid.uuid4()}@test.com"
+    await client.post("/auth/register", json={"email": email, "password": "password123"})
+    login = await client.post("/auth/login", data={"username": email, "password": "password123"})
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+async def upload(client, headers, body: bytes, filename: str, **params):
+    return await client.post(
+        "/study-items/import",
+        params=params,
+        files={"file": (filename, body, "application/octet-stream")},
+        headers=headers,
+    )
+
+
+@pytest.mark.asyncio
+async def test_export_streams_every_item_in_both_formats(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(transfer, "EXPORT_BATCH_SIZE", 2)  # several chunks
+    ids = []
+    for n in range(5):
+        created = await client.post(
+            "/study-items/",
+            json={"title": f"Item, {n}", "description": "line\nbreak" if n == 0 else None,
+                  "type": "task" if n % 2 else "plan"},
+            headers=auth_headers,
+        )
+        ids.append(created.json()["id"])
+    await client.patch(f"/study-items/{ids[1]}/complete", headers=auth_headers)
+
+    response = await client.get("/study-items/export", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "study-items.ndjson" in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ids
+    assert set(rows[0]) == set(transfer.EXPORT_COLUMNS)
+    assert rows[1]["completed"] is True and rows[1]["completed_date"]
+    assert rows[2]["completed_date"] is None
+
+    response = await client.get("/study-items/export?format=csv", headers=auth_headers)
+
+    assert response.headers["content-type"].startswith("text/csv")
+    records = list(csv.DictReader(io.StringIO(response.text, newline="")))
+    assert [int(record["id"]) for record in records] == ids
+    assert records[0]["title"] == "Item, 0"
+    assert records[0]["description"] == "line\nbreak"
+    assert records[1]["completed"] == "true"
+    assert records[2]["description"] == ""
+
+
+@pytest.mark.asyncio
+async def test_export_is_scoped_to_the_owner(client, auth_headers):
+    await client.post(
+        "/study-items/", json={"title": "Mine", "type": "task"}, headers=auth_headers
+    )
+    other = await new_user(client)
+
+    assert (await client.get("/study-items/export", headers=other)).text == ""
+    csv_body = (await client.get("/study-items/export?format=csv", headers=other)).text
+    assert csv_body == "id,title,description,type,completed,completed_date\r\n"
+
+    assert (await client.get("/study-items/export?format=xml", headers=other)).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_inserts_in_batches_and_reports_bad_rows(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(transfer, "IMPORT_BATCH_SIZE", 2)
+    lines = [
+        {"title": "Imported one", "type": "task"},
+        {"title": "Imported two", "type": "task", "completed": True, "completed_date": "2024-05-01"},
+        "not json",
+        {"title": "", "type": "task"},
+        {"title": "Wrong type", "type": "note"},
+        ["an", "array"],
+        {"title": "Imported plan", "type": "plan", "description": "kept",
+         "completed": True, "completed_date": "2024-05-01"},
+    ]
+    body = "\n".join(
+        line if isinstance(line, str) else json.dumps(line) for line in lines
+    ) + "\n\n"
+
+    response = await upload(client, auth_headers, body.encode(), "items.ndjson")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["imported"], data["failed"]) == (3, 4)
+    assert [error["line"] for error in data["errors"]] == [3, 4, 5, 6]
+    assert data["errors"][0]["detail"] == "invalid JSON"
+    assert data["errors"][1]["detail"].startswith("title:")
+    assert "task" in data["errors"][2]["detail"]
+
+    items = (await client.get("/study-items/", headers=auth_headers)).json()
+    assert sorted(item["title"] for item in items) == ["Imported one", "Imported plan", "Imported two"]
+
+    progress = (await client.get("/dashboard/", headers=auth_headers)).json()
+    assert progress["progress"]["total_tasks"] == 2
+    assert progress["progress"]["completed_tasks"] == 1
+    assert progress["plans"]["total_plans"] == 1
+
+    # Two batches completed items on the same day; the rollup adds them up.
+    history = (await client.get(
+        "/analytics/activity?start=2024-01-01&end=2024-12-31", headers=auth_headers
+    )).json()
+    assert history["series"] == [{
+        "date": "2024-05-01", "completed_tasks": 1, "completed_plans": 1, "total": 2,
+    }]
+
+    found = (await client.get("/study-items/search?q=imported", headers=auth_headers)).json()
+    assert len(found) == 3
+
+
+@pytest.mark.asyncio
+async def test_csv_round_trip_between_users(client, auth_headers):
+    for title in ["Quoted, title", 'Has "quotes"']:
+        await client.post(
+            "/study-items/", json={"title": title, "type": "task"}, headers=auth_headers
+        )
+    exported = (await client.get("/study-items/export?format=csv", headers=auth_headers)).content
+
+    other = await new_user(client)
+    response = await upload(client, other, b"\xef\xbb\xbf" + exported, "backup.txt", format="csv")
+
+    assert response.json() == {"imported": 2, "failed": 0, "errors": []}
+    items = (await client.get("/study-items/", headers=other)).json()
+    assert [item["title"] for item in items] == ["Quoted, title", 'Has "quotes"']
+    assert all(not item["completed"] for item in items)
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_unknown_formats_and_undecodable_files(client, auth_headers):
+    response = await upload(client, auth_headers, b"{}", "items.xml")
+    assert response.status_code == 400
+
+    body = b'{"title": "Before", "type": "task"}\n\xff\xfe broken\n'
+    response = await upload(client, auth_headers, body, "items.jsonl")
+
+    data = response.json()
+    assert data["imported"] == 1
+    assert data["failed"] == 1
+    assert data["errors"][0]["detail"].startswith("unreadable")
@@ -0,0 +1,153 @@
+import csv
+import io
+import itertools
+import os
+from typing import Iterator, Optional
+
+import orjson
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+import schemas
+
+
+EXPORT_COLUMNS = ("id", "title", "description", "type", "completed", "completed_date")
+# Rows per database round trip and per chunk of the streamed body.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Rows per INSERT and per transaction.
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# Row errors listed in the import response; all of them are counted.
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def check_format(format: str) -> str:
+    if format not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of: {', '.join(MEDIA_TYPES)}"
+        )
+    return format
+
+
+def upload_format(format: Optional[str], filename: Optional[str]) -> str:
+    """An explicit ?format= wins; otherwise the file extension decides."""
+    if format:
+        return check_format(format)
+    extension = os.path.splitext(filename or "")[1].lstrip(".").lower()
+    if extension in ("ndjson", "jsonl"):
+        return "ndjson"
+    if extension == "csv":
+        return "csv"
+    raise HTTPException(
+        status_code=400,
+        detail="pass ?format=ndjson|csv or upload a .ndjson/.jsonl/.csv file"
+    )
+
+
+# -----------------------------
+# EXPORT
+# -----------------------------
+def csv_header() -> bytes:
+    return (",".join(EXPORT_COLUMNS) + "\r\n").encode()
+
+
+def encode_rows(rows, format: str) -> bytes:
+    """One chunk of the export body; rows are tuples in EXPORT_COLUMNS order."""
+    if format == "ndjson":
+        return b"".join(
+            orjson.dumps(dict(zip(EXPORT_COLUMNS, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for row in rows:
+        writer.writerow(
+            "" if value is None else str(value).lower() if isinstance(value, bool) else value
+            for value in row
+        )
+    return out.getvalue().encode()
+
+
+# -----------------------------
+# IMPORT
+# -----------------------------
+def _ndjson_records(text) -> Iterator[tuple[int, object]]:
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield line_number, "invalid JSON"
+
+
+def _csv_records(text) -> Iterator[tuple[int, object]]:
+    reader = csv.DictReader(text)
+    for record in reader:
+        # Empty cells mean "not given", so the schema defaults apply.
+        yield reader.line_num, {
+            key: value for key, value in record.items() if key and value not in ("", None)
+        }
+
+
+def _validate(record) -> tuple[Optional[dict], Optional[str]]:
+    if isinstance(record, str):
+        return None, record
+    if not isinstance(record, dict):
+        return None, "expected an object"
+    try:
+        item = schemas.StudyItemImport.model_validate(record)
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        return None, f"{field}: {error['msg']}" if field else error["msg"]
+    if item.type not in ("task", "plan"):
+        return None, "type must be either 'task' or 'plan'"
+
+    return {
+        "title": item.title,
+        "description": item.description,
+        "type": item.type,
+        "completed": item.completed,
+        "completed_date": item.completed_date if item.completed else None,
+    }, None
+
+
+class _Undecodable(Exception):
+    pass
+
+
+def _lines(upload) -> Iterator[str]:
+    # Decoded a line at a time, so a bad byte is pinned to its line.
+    for line_number, line in enumerate(upload, 1):
+        try:
+            text = line.decode("utf-8")
+        except UnicodeDecodeError:
+            raise _Undecodable(line_number) from None
+        yield text.lstrip("\ufeff") if line_number == 1 else text
+
+
+def parse(upload, format: str) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """(line, values, error) per record of a binary file, read incrementally.
+
+    ``values`` are StudyItem columns without owner_id. A file that stops
+    decoding or parsing part way ends with one error for that line.
+    """
+    lines = _lines(upload)
+    records = _ndjson_records(lines) if format == "ndjson" else _csv_records(lines)
+    line_number = 0
+    try:
+        for line_number, record in records:
+            values, error = _validate(record)
+            yield line_number, values, error
+    except _Undecodable as exc:
+        yield exc.args[0], None, "unreadable: not UTF-8 text"
+    except csv.Error as exc:
+        yield line_number + 1, None, f"unreadable: {exc}"
+
+
+def next_batch(records: Iterator, size: int = None) -> list:
+    return list(itertools.islice(records, size or IMPORT_BATCH_SIZE))
@@ -0,0 +1,49 @@
+import os
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+import models
+from cache import TTLCache
+
+
+# token -> user id, kept until the token's own "exp"
+tokens = TTLCache(maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "10000")))
+
+# user id -> schemas.CurrentUser snapshot
+users = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "300")),
+)
+
+
+def invalidate_user(user_id: int):
+    users.pop(user_id)
+
+
+def invalidate_all():
+    users.clear()
+
+
+# -----------------------------
+# INVALIDATION ON COMMIT
+# -----------------------------
+# Changed users are collected during flush and only evicted once the
+# transaction commits, so a concurrent reader cannot re-cache the old row
+# between the flush and the commit.
+@event.listens_for(models.User, "after_update")
+def _remember_changed_user(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_changed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_user_ids", None)
@@ -13,8 +13,21 @@ export interface StudyItem {
 // ----------------------
 // GET ALL (tasks or plans)
 // ----------------------
-export const getStudyItems = (type: StudyItemType) =>
-  api.get<StudyItem[]>(`/study-items?type=${type}`);
+// The list is paginated; follow X-Next-Cursor until the last page.
+export const getStudyItems = async (type: StudyItemType) => {
+  const items: StudyItem[] = [];
+  let cursor: string | undefined;
+
+  do {
+    const res = await api.get<StudyItem[]>('/study-items/', {
+      params: { type, cursor, limit: 500 },
+    });
+    items.push(...res.data);
+    cursor = res.headers['x-next-cursor'];
+  } while (cursor);
+
+  return { data: items };
+};
 
 // ----------------------
 // GET BY ID